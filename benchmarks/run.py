@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import importlib
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+# Benchmarks the search pipeline against recorded API responses served by a
+# local stand-in (benchmarks/server.py), so no live API or key is needed:
+#   python benchmarks/run.py [--sizes 1000,10000,100000] [--output results.json]
+#                            [--compare previous.json]
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# Provider settings for the stand-in: dummy keys, no IP lookup, no pacing
+BENCHMARK_ENV = {
+    "GOOGLE_API_KEY": "benchmark",
+    "GOOGLE_CSE_ID": "benchmark",
+    "CORE_API_KEY": "benchmark",
+    "MSA_LOCATION": "Benchmark",
+    "MSA_LOCATION_CACHE": "",
+    "MSA_MAX_RETRIES": "0"
+}
+API_PROVIDERS = ["google", "zenodo", "core", "doaj", "openaire", "arxiv"]
+# Providers with a separate page parser, and the page size they request
+PARSERS = {
+    "zenodo": ("providers.zenodo", "_parse_zenodo_page", "_zenodo_result", 100),
+    "core": ("providers.core", "_parse_core_page", "_core_result", 100),
+    "doaj": ("providers.doaj", "_parse_doaj_page", "_doaj_result", 100),
+    "openaire": ("providers.openaire", "_parse_openaire_page", "_openaire_result", 100),
+    "arxiv": ("providers.arxiv", "_parse_arxiv_page", "_arxiv_result", 500)
+}
+# ODS is written cell by cell by odfpy; larger sizes take minutes
+ODS_MAX_ROWS = 10000
+
+@contextmanager
+def _quiet():
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+@contextmanager
+def _workdir():
+    # perform_search and clean read and write output/ and cleaned/ under the cwd
+    previous = os.getcwd()
+    path = tempfile.mkdtemp(prefix="msa-bench-")
+    os.chdir(path)
+    try:
+        yield Path(path)
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def _measure(run, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        with _quiet():
+            run(state) if setup else run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+class Suite:
+    def __init__(self, sizes, repeat, server):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.server = server
+        self.results = []
+        self._records = None
+        # Import costs belong to benchmarks/startup.py, not to the first measurement
+        for module in ("pandas", "pyarrow.parquet", "pyarrow.feather"):
+            importlib.import_module(module)
+
+    def record(self, benchmark, variant, rows, timings, **extra):
+        median = statistics.median(timings)
+        result = {
+            "benchmark": benchmark,
+            "variant": variant,
+            "rows": rows,
+            "seconds": median,
+            "min_s": min(timings),
+            "runs": len(timings),
+            "rows_per_s": rows / median if median else None
+        }
+        result.update(extra)
+        self.results.append(result)
+        # Progress goes to stderr, so stdout only carries the JSON report
+        print(f"  {benchmark:<10} {variant:<18} {rows:>7} rows  {median:8.3f}s"
+              + (f"  ({result['rows_per_s']:,.0f} rows/s)" if rows else ""), file=sys.stderr)
+
+    def records(self, count):
+        # Real-shaped SearchResult records, parsed from the fixtures
+        from response_cache import CachedResponse
+        if self._records is None or len(self._records) < count:
+            per_provider = count // len(PARSERS) + 1
+            records = []
+            with _quiet():
+                for name, (module, parse, make, _) in PARSERS.items():
+                    module = importlib.import_module(module)
+                    page = self.server.fixtures[name].render(0, per_provider, per_provider)
+                    items, _ = getattr(module, parse)(CachedResponse(200, page.encode("utf-8"), "utf-8"))
+                    records += [getattr(module, make)(item, "urban manufacturing", "Benchmark") for item in items]
+            self._records = records
+        return self._records[:count]
+
+    def search(self):
+        # End to end: fan-out, HTTP to the stand-in, parsing and writing,
+        # with provider threads and then as tasks on one event loop
+        from search import perform_search, set_async_mode
+        from writers import read_results
+        for mode in ("threads", "async"):
+            set_async_mode(mode == "async")
+            for max_results in (100, 1000):
+                rows = []
+
+                def run():
+                    with _workdir():
+                        rows.append(len(read_results(perform_search("urban manufacturing", max_results,
+                                                                     API_PROVIDERS, output_format="parquet"))))
+                timings = _measure(run, self.repeat)
+                variant = f"max_results={max_results}" + (" async" if mode == "async" else "")
+                self.record("search", variant, rows[-1], timings, providers=API_PROVIDERS,
+                            requests=self.server.requests)
+        set_async_mode(False)
+
+    def fetch(self):
+        # Each provider alone over local HTTP: request, parse and build records
+        from providers import load_provider
+        for name in API_PROVIDERS:
+            count = []
+
+            def run():
+                count.append(sum(len(batch) for batch in load_provider(name)("urban manufacturing", 1000)))
+            timings = _measure(run, self.repeat)
+            self.record("fetch", name, count[-1], timings)
+
+    def parse(self):
+        # Page parsing and record building only, on pre-rendered pages: in
+        # process, then spread over parse_pool's worker processes
+        import parse_pool
+        from response_cache import CachedResponse
+        all_pages = []
+        for name, (module, parse, make, page_size) in PARSERS.items():
+            module = importlib.import_module(module)
+            pages = [CachedResponse(200, self.server.fixtures[name].render(offset, page_size, 1000).encode("utf-8"),
+                                    "utf-8") for offset in range(0, 1000, page_size)]
+            all_pages += [(getattr(module, parse), getattr(module, make), page) for page in pages]
+
+            def run():
+                for page in pages:
+                    items, _ = getattr(module, parse)(page)
+                    for item in items:
+                        getattr(module, make)(item, "urban manufacturing", "Benchmark")
+            timings = _measure(run, self.repeat)
+            self.record("parse", name, 1000, timings)
+
+        def run_pooled():
+            futures = [parse_pool.submit(parse, make, page, "urban manufacturing", "Benchmark", 0, 1000, 0)
+                       for parse, make, page in all_pages]
+            for future in futures:
+                future.result()
+        for workers in sorted({1, os.cpu_count() or 1}):
+            parse_pool.set_workers(workers)
+            parse_pool.shutdown()
+            run_pooled()  # starts the workers
+            self.record("parse", f"pool x{workers}", 1000 * len(PARSERS), _measure(run_pooled, self.repeat))
+        parse_pool.set_workers(0)
+        parse_pool.shutdown()
+
+    def frame(self):
+        from results import to_frame, to_arrow
+        for size in self.sizes:
+            records = self.records(size)
+            self.record("frame", "pandas", size, _measure(lambda: to_frame(records), self.repeat))
+            self.record("frame", "arrow", size, _measure(lambda: to_arrow(records), self.repeat))
+
+    def write(self):
+        from writers import OUTPUT_FORMATS, open_writer
+        for size in self.sizes:
+            records = self.records(size)
+            for output_format in OUTPUT_FORMATS:
+                if output_format == "ods" and size > ODS_MAX_ROWS:
+                    continue
+
+                def run():
+                    with _workdir() as path:
+                        writer = open_writer(path / "results", output_format)
+                        for start in range(0, len(records), 100):
+                            writer.write_records(records[start:start + 100])
+                        writer.close()
+                self.record("write", output_format, size, _measure(run, self.repeat))
+
+    def clean(self):
+        # Full clean over result files of 1000 rows each, 10% of them repeats
+        from writers import open_writer
+        from clean import clean_and_format_results
+        for size in self.sizes:
+            records = self.records(size)
+            repeats = records[:size // 10]
+            rows = records[:size - len(repeats)] + repeats
+
+            def setup():
+                context = _workdir()
+                path = context.__enter__()
+                (path / "output").mkdir()
+                for start in range(0, len(rows), 1000):
+                    writer = open_writer(path / "output" / f"{start:08d}_benchmark", "parquet")
+                    writer.write_records(rows[start:start + 1000])
+                    writer.close()
+                return context
+
+            def run(context):
+                try:
+                    clean_and_format_results(output_format="parquet")
+                finally:
+                    context.__exit__(None, None, None)
+            self.record("clean", "full", size, _measure(run, self.repeat, setup))
+
+    def normalize(self):
+        # The clean pipeline's normalization stage alone, on frames shaped like its loaded result files
+        from results import to_frame
+        from normalize import normalize_results
+        for size in self.sizes:
+            df = to_frame(self.records(size)).rename(columns={"Search Engine": "Search Platform",
+                                                             "Result Title": "Title", "Result Link": "Link",
+                                                             "Result Description": "Description"})
+            self.record("normalize", "frame", size, _measure(lambda: normalize_results(df), self.repeat))
+
+def _git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {(r["benchmark"], r["variant"], r["rows"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('version')}):", file=sys.stderr)
+    for result in results:
+        before = previous.get((result["benchmark"], result["variant"], result["rows"]))
+        if before:
+            change = result["seconds"] / before
+            marker = "🐢" if change > 1.1 else "🚀" if change < 0.9 else "  "
+            print(f"  {marker} {result['benchmark']:<10} {result['variant']:<18} {result['rows']:>7} rows  "
+                  f"{before:8.3f}s -> {result['seconds']:8.3f}s  ({change:.2f}x)", file=sys.stderr)
+
+BENCHMARKS = ["search", "fetch", "parse", "frame", "write", "clean", "normalize"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite against recorded API responses")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Row counts for the frame, write, clean and normalize benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (the median is reported)")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="Comma-separated benchmarks to run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stand-in waits per response")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Print the change against an earlier JSON result file")
+    args = parser.parse_args()
+
+    os.environ.update(BENCHMARK_ENV)
+    import ratelimit
+    for name, _, _ in ratelimit.HOST_LIMITS.values():
+        os.environ[f"MSA_RATE_LIMIT_{name}"] = "1000000"
+    import response_cache
+    response_cache.set_cache_mode(enabled=False)
+
+    from server import FixtureServer, install
+    server = FixtureServer(latency=args.latency, total=100000).start()
+    install(server)
+
+    suite = Suite([int(size) for size in args.sizes.split(",")], args.repeat, server)
+    started = time.perf_counter()
+    try:
+        for name in args.only.split(","):
+            print(f"⏱️ {name}", file=sys.stderr)
+            getattr(suite, name)()
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "version": _git_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": suite.sizes,
+            "repeat": args.repeat,
+            "latency_s": args.latency,
+            "total_s": time.perf_counter() - started
+        },
+        "results": suite.results
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"✅ Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        _compare(suite.results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import json
+import time
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from requests.adapters import HTTPAdapter
+
+# A local stand-in for the search APIs: pages are rendered from the recorded
+# responses in fixtures/, with "{n}" in each recorded item replaced by the
+# result's position so every page holds distinct results.
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Real API roots, redirected to the stand-in by install()
+API_ROOTS = [
+    "https://www.googleapis.com/",
+    "https://zenodo.org/",
+    "https://api.core.ac.uk/",
+    "https://doaj.org/",
+    "https://api.openaire.eu/",
+    "http://export.arxiv.org/",
+    "https://ipapi.co/"
+]
+
+def _json_fixture(name):
+    return json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8"))
+
+def _render(templates, offset, count):
+    # Items as JSON text, numbered offset, offset + 1, ...
+    return [templates[n % len(templates)].replace("{n}", str(n)) for n in range(offset, offset + count)]
+
+class Fixture:
+    # A recorded JSON page; items_path leads to its result list
+    def __init__(self, name, items_path, total_path):
+        self.page = _json_fixture(name)
+        self.items_path = items_path
+        self.total_path = total_path
+        container = self.page
+        for key in items_path[:-1]:
+            container = container[key]
+        self.templates = [json.dumps(item) for item in container[items_path[-1]]]
+        container = self.page
+        for key in total_path[:-1]:
+            container = container[key]
+        self.total = int(container[total_path[-1]])
+
+    def render(self, offset, size, total):
+        count = max(0, min(size, total - offset))
+        page = json.loads(json.dumps(self.page))
+        container = page
+        for key in self.total_path[:-1]:
+            container = container[key]
+        container[self.total_path[-1]] = total if not isinstance(container[self.total_path[-1]], str) else str(total)
+        container = page
+        for key in self.items_path[:-1]:
+            container = container[key]
+        container[self.items_path[-1]] = "__ITEMS__"
+        return json.dumps(page).replace('"__ITEMS__"', "[" + ", ".join(_render(self.templates, offset, count)) + "]")
+
+class ArxivFixture:
+    def __init__(self):
+        feed = (FIXTURES / "arxiv.xml").read_text(encoding="utf-8")
+        head, rest = feed.split("<!-- entries -->")
+        body, self.tail = rest.split("<!-- /entries -->")
+        self.head = head
+        self.templates = ["<entry>" + entry for entry in body.split("<entry>")[1:]]
+        self.total = int(head.split("<opensearch:totalResults")[1].split(">")[1].split("<")[0])
+
+    def render(self, offset, size, total):
+        count = max(0, min(size, total - offset))
+        head = self.head.replace(f">{self.total}</opensearch:totalResults>", f">{total}</opensearch:totalResults>")
+        return head + "".join(_render(self.templates, offset, count)) + self.tail
+
+class FixtureServer:
+    # latency: seconds added to every response; total: results each API
+    # claims to have (default: the recorded totals)
+    def __init__(self, latency=0.0, total=None):
+        self.latency = latency
+        self.total = total
+        self.requests = 0
+        self.fixtures = {
+            "google": Fixture("google", ["items"], ["searchInformation", "totalResults"]),
+            "zenodo": Fixture("zenodo", ["hits", "hits"], ["hits", "total"]),
+            "core": Fixture("core", ["results"], ["totalHits"]),
+            "doaj": Fixture("doaj", ["results"], ["total"]),
+            "openaire": Fixture("openaire", ["response", "results", "result"], ["response", "header", "total", "$"]),
+            "arxiv": ArxivFixture()
+        }
+        self._server = None
+
+    def _total(self, name):
+        return self.total if self.total is not None else self.fixtures[name].total
+
+    def handle(self, method, path, params, body):
+        # Returns (status, content type, body) for a request to a real API path
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if path.startswith("/customsearch/"):
+            start = int(params.get("start", 1))
+            total = min(self._total("google"), 100)
+            text = self.fixtures["google"].render(start - 1, 10, total)
+            if start + 10 > min(total, 91):
+                page = json.loads(text)
+                page["queries"].pop("nextPage", None)
+                text = json.dumps(page)
+            return 200, "application/json", text
+        if path.startswith("/api/records"):
+            size, page = int(params.get("size", 10)), int(params.get("page", 1))
+            return 200, "application/json", self.fixtures["zenodo"].render((page - 1) * size, size, self._total("zenodo"))
+        if path.startswith("/v3/search/works"):
+            return 200, "application/json", self.fixtures["core"].render(int(body.get("offset", 0)),
+                                                                         int(body.get("limit", 10)), self._total("core"))
+        if path.startswith("/api/v4/search/articles"):
+            size, page = int(params.get("pageSize", 10)), int(params.get("page", 1))
+            return 200, "application/json", self.fixtures["doaj"].render((page - 1) * size, size, self._total("doaj"))
+        if path.startswith("/search/publications"):
+            size, page = int(params.get("size", 10)), int(params.get("page", 1))
+            return 200, "application/json", self.fixtures["openaire"].render((page - 1) * size, size,
+                                                                             self._total("openaire"))
+        if path.startswith("/api/query"):
+            return 200, "application/atom+xml", self.fixtures["arxiv"].render(
+                int(params.get("start", 0)), int(params.get("max_results", 10)), self._total("arxiv"))
+        if path.startswith("/json"):
+            return 200, "application/json", json.dumps({"city": "Vic", "country_name": "Spain"})
+        return 404, "application/json", "{}"
+
+    def start(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body=None):
+                parts = urlsplit(self.path)
+                params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                status, content_type, text = fixture_server.handle(self.command, parts.path, params, body or {})
+                payload = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._reply()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._reply(json.loads(self.rfile.read(length) or b"{}"))
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class _RedirectAdapter(HTTPAdapter):
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+def _redirect_transport(base_url):
+    import httpx
+
+    class RedirectTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            base = httpx.URL(base_url)
+            request.url = request.url.copy_with(scheme=base.scheme, host=base.host, port=base.port)
+            return await super().handle_async_request(request)
+    return RedirectTransport()
+
+def install(server):
+    # Sends every request for the real APIs through the shared session (and
+    # the async client, which must not have been created yet) to the stand-in
+    import http_client
+    session = http_client.get_session()
+    transport = _redirect_transport(server.url)
+    for root in API_ROOTS:
+        session.mount(root, _RedirectAdapter(server.url, pool_connections=1, pool_maxsize=20))
+        http_client.ASYNC_MOUNTS[root.rstrip("/")] = transport
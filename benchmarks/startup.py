@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Measures how long the CLI takes to start, and which imports it spends
+# that time on (from python -X importtime). Run from anywhere:
+#   python benchmarks/startup.py [--runs 5] [--budget 1.0] [--top 10] [--json]
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "--help": ["main.py", "--help"],
+    "search --help": ["main.py", "search", "--help"],
+    "clean --help": ["main.py", "clean", "--help"],
+    # Everything `clean` imports before it starts reading files
+    "clean imports": ["-c", "import main, clean"]
+}
+
+def _run(args, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+def _heaviest_imports(stderr, top):
+    # Lines look like "import time: self [us] | cumulative | name", nesting
+    # shown by indentation; only top-level packages are reported
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+def benchmark(runs=5, top=10):
+    results = {}
+    for name, args in COMMANDS.items():
+        _run(args)  # warm the bytecode and file caches
+        timings = [_run(args)[0] for _ in range(runs)]
+        _, stderr = _run(args, importtime=True)
+        results[name] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "heaviest_imports": [{"module": module, "cumulative_s": seconds}
+                                 for module, seconds in _heaviest_imports(stderr, top)]
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per command")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("MSA_STARTUP_BUDGET", 1.0)),
+                        help="Seconds a command may take before the benchmark fails")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = benchmark(args.runs, args.top)
+    over_budget = [name for name, result in results.items() if result["median_s"] > args.budget]
+
+    if args.json:
+        print(json.dumps({"budget_s": args.budget, "commands": results, "over_budget": over_budget}, indent=2))
+    else:
+        for name, result in results.items():
+            status = "❌" if name in over_budget else "✅"
+            print(f"{status} {name}: {result['median_s']:.3f}s median "
+                  f"({result['min_s']:.3f}-{result['max_s']:.3f}s over {args.runs} runs)")
+            for entry in result["heaviest_imports"]:
+                print(f"   {entry['cumulative_s']:.3f}s  {entry['module']}")
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
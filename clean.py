@@ -1,55 +1,238 @@
 import os
+import shutil
+import sqlite3
+import hashlib
 import pandas as pd
 from datetime import datetime
+from writers import READABLE_EXTENSIONS, read_results, write_frame
+from dedup import canonical_keys, dedupe
+from normalize import normalize_results
+from enrich import enrich_scholar
+import metrics
+import search_index
 
-def clean_and_format_results():
-    output_folder = "output"
-    cleaned_folder = "cleaned"
-    
+SOURCE_COLUMNS = ["Search Engine", "Search Query", "Result Title", "Result Link", "DOI", "Year",
+                  "Authors", "Venue", "Source ID", "Result Description"]
+
+OUTPUT_FOLDER = "output"
+CLEANED_FOLDER = "cleaned"
+# Incremental mode keeps its state and its dataset parts under cleaned/
+INDEX_PATH = os.path.join(CLEANED_FOLDER, "clean_index.sqlite")
+DATASET_FOLDER = os.path.join(CLEANED_FOLDER, "cleaned_search_results")
+
+def _load_results(file_path):
+    # Columnar formats only load the columns we keep. Files written before
+    # results had their own DOI/Year fields have no DOI column, and their
+    # titles carry the venue/year/category decorations normalize.py moves out.
+    # The columns are checked on the frame itself, so an ODS file is only read once.
+    df = read_results(file_path, columns=SOURCE_COLUMNS, fill_missing=False)
+    decorated = "DOI" not in df
+    df = df.reindex(columns=SOURCE_COLUMNS, fill_value="")
+    df = df.rename(columns={
+        "Search Engine": "Search Platform",
+        "Result Title": "Title",
+        "Result Link": "Link",
+        "Result Description": "Description"
+    })
+    df = df[["Search Platform", "Search Query", "Title", "Link", "DOI", "Year", "Authors", "Venue", "Source ID",
+             "Description"]]
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce").astype("Int32")
+    return df.assign(Decorated=decorated)
+
+def _normalize(df):
+    # Tidied text and the DOI, year, authors and venue the files left out,
+    # with the titles of older files undecorated; the descriptions were
+    # only loaded for this
+    with metrics.timer("stage_seconds", stage="normalize"):
+        return normalize_results(df, decorated=df["Decorated"]).drop(columns=["Decorated", "Description"])
+
+def _index(df, filename):
+    # Cleaned rows refresh the ./msa find index, e.g. with enriched authors
+    if search_index.enabled():
+        with metrics.timer("stage_seconds", stage="index"):
+            search_index.add_frame(df, filename)
+
+def _prepare_folders():
     # Check if output folder exists
-    if not os.path.exists(output_folder):
-        print(f"❌ Output folder '{output_folder}' not found.")
-        return
-        
+    if not os.path.exists(OUTPUT_FOLDER):
+        print(f"❌ Output folder '{OUTPUT_FOLDER}' not found.")
+        return False
+
     # Create cleaned folder if it doesn't exist
-    if not os.path.exists(cleaned_folder):
-        os.makedirs(cleaned_folder)
-        print(f"📁 Created folder: {cleaned_folder}")
+    if not os.path.exists(CLEANED_FOLDER):
+        os.makedirs(CLEANED_FOLDER)
+        print(f"📁 Created folder: {CLEANED_FOLDER}")
+    return True
+
+def _result_files():
+    return [file for file in sorted(os.listdir(OUTPUT_FOLDER)) if file.endswith(READABLE_EXTENSIONS)]
+
+def clean_and_format_results(output_format=None, incremental=False, rebuild=False, enrich=False):
+    if incremental or rebuild:
+        return clean_incremental(output_format, rebuild, enrich)
+
+    if not _prepare_folders():
+        return
         
     all_data = []
 
-    for file in os.listdir(output_folder):
-        if file.endswith(".ods"):
-            try:
-                file_path = os.path.join(output_folder, file)
-                df = pd.read_excel(file_path, engine="odf")
-                df = df.rename(columns={
-                    "Search Engine": "Search Platform",
-                    "Result Title": "Title",
-                    "Result Link": "Link"
-                })
-                df = df[["Search Platform", "Search Query", "Title", "Link"]]
-                all_data.append(df)
-                print(f"✅ Loaded: {file}")
-            except Exception as e:
-                print(f"⚠️ Error reading {file}: {e}")
+    for file in _result_files():
+        try:
+            with metrics.timer("stage_seconds", stage="load"):
+                all_data.append(_load_results(os.path.join(OUTPUT_FOLDER, file)))
+            print(f"✅ Loaded: {file}")
+        except Exception as e:
+            print(f"⚠️ Error reading {file}: {e}")
 
     if not all_data:
-        print("❌ No ODS files found in the output folder.")
+        print("❌ No result files found in the output folder.")
         return
 
-    merged_df = pd.concat(all_data, ignore_index=True)
+    merged_df = _normalize(pd.concat(all_data, ignore_index=True))
 
-    # Drop duplicates based on Title or Link
-    cleaned_df = merged_df.drop_duplicates(subset=["Title", "Link"])
+    # Drop duplicates by canonical DOI/URL, normalized title and near-identical title;
+    # _normalize already took the decorations off the titles that had them
+    with metrics.timer("stage_seconds", stage="dedupe"):
+        cleaned_df = dedupe(merged_df, decorated=False)
+    if enrich:
+        with metrics.timer("stage_seconds", stage="enrich"):
+            cleaned_df = enrich_scholar(cleaned_df)
 
     # Save cleaned file in the cleaned folder
     today = datetime.now().strftime("%Y-%m-%d")
-    output_filename = os.path.join(cleaned_folder, f"cleaned_search_results_{today}.ods")
-    cleaned_df.to_excel(output_filename, engine="odf", index=False)
+    with metrics.timer("stage_seconds", stage="write"):
+        output_filename = write_frame(cleaned_df, os.path.join(CLEANED_FOLDER, f"cleaned_search_results_{today}"),
+                                      output_format)
+
+    _index(cleaned_df, output_filename)
 
     print(f"\n🎉 Cleaned results saved to: {output_filename}")
     print(f"📊 Total unique entries: {len(cleaned_df)}")
+    return output_filename
+
+def _open_index():
+    conn = sqlite3.connect(INDEX_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            name TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            sha1 TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS seen (
+            title TEXT NOT NULL,
+            link TEXT NOT NULL,
+            PRIMARY KEY (title, link)
+        ) WITHOUT ROWID
+    """)
+    # Canonical link ("l:") and normalized title ("t:") keys, see dedup.py
+    conn.execute("CREATE TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+    return conn
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _changed_files(conn):
+    # A file is new work when its mtime/size moved and its content hash too;
+    # a touched-but-identical file only gets its fingerprint refreshed
+    known = {name: (mtime, size, sha1) for name, mtime, size, sha1 in conn.execute("SELECT * FROM files")}
+    changed = []
+    for file in _result_files():
+        stat = os.stat(os.path.join(OUTPUT_FOLDER, file))
+        previous = known.get(file)
+        if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+            continue
+        sha1 = _file_sha1(os.path.join(OUTPUT_FOLDER, file))
+        if previous and previous[2] == sha1:
+            conn.execute("UPDATE files SET mtime = ?, size = ? WHERE name = ?", (stat.st_mtime, stat.st_size, file))
+            continue
+        changed.append((file, stat.st_mtime, stat.st_size, sha1))
+    return changed
+
+def _new_rows(conn, df):
+    # Dedupe the new rows among themselves, then drop those whose exact
+    # (Title, Link) or canonical link/title key is already in the index.
+    # The rows are normalized, so no title is undecorated a second time.
+    df = dedupe(df, decorated=False)
+    link_keys, title_keys = canonical_keys(df, decorated=False)
+    pairs = df[["Title", "Link"]].fillna("").astype(str)
+    keep = []
+    for (title, link), link_key, title_key in zip(pairs.itertuples(index=False, name=None), link_keys, title_keys):
+        keys = [f"l:{link_key}"] if link_key else []
+        keys += [f"t:{title_key}"] if title_key else []
+        known = conn.execute("SELECT 1 FROM seen WHERE title = ? AND link = ?", (title, link)).fetchone()
+        known = known or any(conn.execute("SELECT 1 FROM seen_keys WHERE key = ?", (key,)).fetchone() for key in keys)
+        keep.append(not known)
+        if not known:
+            conn.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (title, link))
+            conn.executemany("INSERT OR IGNORE INTO seen_keys VALUES (?)", [(key,) for key in keys])
+    return df[keep]
+
+def clean_incremental(output_format=None, rebuild=False, enrich=False):
+    if not _prepare_folders():
+        return
+
+    if rebuild:
+        print("🧹 Rebuilding the clean index from scratch")
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+        shutil.rmtree(DATASET_FOLDER, ignore_errors=True)
+
+    conn = _open_index()
+    try:
+        new_data = []
+        processed = []
+        for file, mtime, size, sha1 in _changed_files(conn):
+            try:
+                with metrics.timer("stage_seconds", stage="load"):
+                    new_data.append(_load_results(os.path.join(OUTPUT_FOLDER, file)))
+                processed.append((file, mtime, size, sha1))
+                print(f"✅ Loaded: {file}")
+            except Exception as e:
+                print(f"⚠️ Error reading {file}: {e}")
+
+        if not new_data:
+            conn.commit()
+            print("✨ No new result files since the last clean.")
+            return
+
+        merged_df = _normalize(pd.concat(new_data, ignore_index=True))
+        with metrics.timer("stage_seconds", stage="dedupe"):
+            unique_df = _new_rows(conn, merged_df)
+        if enrich and len(unique_df):
+            with metrics.timer("stage_seconds", stage="enrich"):
+                unique_df = enrich_scholar(unique_df)
+
+        output_filename = None
+        if len(unique_df):
+            os.makedirs(DATASET_FOLDER, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            with metrics.timer("stage_seconds", stage="write"):
+                output_filename = write_frame(unique_df, os.path.join(DATASET_FOLDER, f"part-{timestamp}"),
+                                              output_format)
+
+        if output_filename:
+            _index(unique_df, output_filename)
+
+        # Only mark files as processed once their rows are safely written
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", processed)
+        conn.commit()
+        total = conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+    finally:
+        conn.close()
+
+    if output_filename:
+        print(f"\n🎉 {len(unique_df)} new unique entries appended to: {output_filename}")
+    else:
+        print("\n✨ No new unique entries in the new files.")
+    print(f"📊 Total unique entries: {total}")
+    return output_filename
 
 if __name__ == "__main__":
-    clean_and_format_results()
\ No newline at end of file
+    clean_and_format_results()
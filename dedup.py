@@ -0,0 +1,209 @@
+import re
+import zlib
+from urllib.parse import urlsplit, parse_qsl, urlencode, unquote
+import numpy as np
+import pandas as pd
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"<>?#]+', re.IGNORECASE)
+ARXIV_DOI_PATTERN = re.compile(r'^10\.48550/arxiv\.(.+)$')
+ARXIV_URL_PATTERN = re.compile(r'arxiv\.org/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?/?$', re.IGNORECASE)
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+# Decorations the providers add to titles (see search.py)
+ARXIV_CATEGORY_SUFFIX = r'\s*\[[A-Za-z\-]+(?:\.[A-Za-z\-]+)?\]$'
+SCHOLAR_YEAR_SUFFIX = r'\s\((?:1[89]|20)\d{2}\)(?: - .*)?$'
+VENUE_SUFFIX_PLATFORMS = ["Zenodo", "CORE", "DOAJ", "OpenAIRE"]
+
+# Titles shorter than this ("Introduction", "Editorial") never merge on title alone
+MIN_TITLE_TOKENS = 4
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# 32 MinHash values in 8 bands of 4: pairs above ~0.6 Jaccard share a band
+# with high probability, and every candidate is verified exactly afterwards
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+MINHASH_CHUNK = 20000
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240101)
+_HASH_A = _rng.randint(1, _PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _rng.randint(0, _PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+def extract_doi(text):
+    if not isinstance(text, str):
+        return ""
+    match = DOI_PATTERN.search(unquote(text))
+    return match.group(0).rstrip('.,;)]').lower() if match else ""
+
+def canonical_url(url):
+    # doi.org, publisher and arXiv links to the same paper collapse to one key
+    if not isinstance(url, str) or not url.strip():
+        return ""
+    url = url.strip()
+
+    doi = extract_doi(url)
+    if doi:
+        arxiv = ARXIV_DOI_PATTERN.match(doi)
+        return f"arxiv:{arxiv.group(1)}" if arxiv else f"doi:{doi}"
+
+    arxiv = ARXIV_URL_PATTERN.search(url)
+    if arxiv:
+        return f"arxiv:{arxiv.group(1).lower()}"
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    params = sorted((key, value) for key, value in parse_qsl(parts.query)
+                    if not key.lower().startswith(TRACKING_PARAMS))
+    query = urlencode(params)
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+def canonical_urls(links):
+    # canonical_url over a column, but only the links that need more than
+    # regex work (DOIs, arXiv, query strings) go through Python one by one
+    links = links.fillna("").astype(str).str.strip()
+    parts = links.str.extract(r"^(?:[A-Za-z][A-Za-z0-9+.\-]*://)?([^/?#]*)([^?#]*)", expand=True)
+    keys = parts[0].str.lower().str.replace(r"^www\.", "", regex=True) + parts[1].str.rstrip("/")
+
+    special = links.str.contains(r"10\.\d{4,9}/|arxiv\.org/|\?|%", regex=True)
+    if special.any():
+        keys[special] = links[special].map(canonical_url)
+    return keys.where(links != "", "")
+
+def canonical_dois(dois):
+    # The DOI field of newer result files, keyed like canonical_url keys a DOI link
+    dois = dois.fillna("").astype(str).str.strip().str.lower()
+    arxiv = dois.str.extract(ARXIV_DOI_PATTERN.pattern, expand=False)
+    keys = ("doi:" + dois).where(arxiv.isna(), "arxiv:" + arxiv.fillna(""))
+    return keys.where(dois != "", "")
+
+def normalize_titles(titles, platforms=None, decorated=None):
+    # platforms enables stripping the decorations older result files put in
+    # titles; decorated limits it to the rows that come from such files
+    titles = titles.fillna("").astype(str)
+    if platforms is not None:
+        platforms = platforms.fillna("").astype(str)
+        if decorated is not None:
+            platforms = platforms.where(pd.Series(decorated, index=platforms.index).astype(bool), "")
+        arxiv = platforms == "arXiv"
+        titles = titles.where(~arxiv, titles.str.replace(ARXIV_CATEGORY_SUFFIX, "", regex=True))
+        scholar = platforms == "Google Scholar"
+        dated = titles.str.contains(SCHOLAR_YEAR_SUFFIX, regex=True)
+        titles = titles.where(~(scholar & dated), titles.str.replace(SCHOLAR_YEAR_SUFFIX, "", regex=True))
+        venue = platforms.isin(VENUE_SUFFIX_PLATFORMS) | (scholar & ~dated)
+        titles = titles.where(~venue, titles.str.rsplit(" - ", n=1).str[0])
+
+    titles = titles.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    titles = titles.str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    return titles
+
+def minhash_signatures(token_sets):
+    # Every set must be non-empty; all token hashes of a chunk are permuted
+    # in one numpy operation and reduced per document with reduceat
+    lengths = np.fromiter((len(tokens) for tokens in token_sets), dtype=np.int64, count=len(token_sets))
+    flat = np.fromiter((zlib.crc32(token.encode()) for tokens in token_sets for token in tokens),
+                       dtype=np.uint64, count=int(lengths.sum()))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+    signatures = np.empty((len(token_sets), MINHASH_PERMUTATIONS), dtype=np.uint64)
+    for start in range(0, len(token_sets), MINHASH_CHUNK):
+        end = min(start + MINHASH_CHUNK, len(token_sets))
+        first, last = offsets[start], offsets[end - 1] + lengths[end - 1]
+        hashed = (flat[first:last, None] * _HASH_A + _HASH_B) % _PRIME
+        signatures[start:end] = np.minimum.reduceat(hashed, offsets[start:end] - first, axis=0)
+    return signatures
+
+def _candidate_pairs(signatures, max_bucket=50):
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    pairs = set()
+    for band in range(LSH_BANDS):
+        chunk = signatures[:, band * rows:(band + 1) * rows]
+        keys = chunk[:, 0].copy()
+        for column in range(1, rows):
+            keys = keys * np.uint64(1000003) ^ chunk[:, column]
+
+        order = np.argsort(keys, kind="stable")
+        _, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+        for start, count in zip(starts[counts > 1], counts[counts > 1]):
+            bucket = order[start:start + count]
+            # Oversized buckets are only compared against their first member
+            anchors = bucket if count <= max_bucket else bucket[:1]
+            for i, a in enumerate(anchors):
+                for b in bucket[i + 1:]:
+                    pairs.add((int(a), int(b)) if a < b else (int(b), int(a)))
+    return pairs
+
+class _UnionFind:
+    def __init__(self, size, dois=None):
+        self.parent = list(range(size))
+        # Per group root, the DOI of the group's rows ("" when none has one)
+        self.dois = list(dois) if dois is not None else [""] * size
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        # Groups with different DOIs are different papers, however alike
+        # their titles; checking the groups, not the two rows, also stops a
+        # row without a DOI from bridging them
+        doi_i, doi_j = self.dois[root_i], self.dois[root_j]
+        if doi_i and doi_j and doi_i != doi_j:
+            return
+        # The earliest row always stays the representative
+        root, other = min(root_i, root_j), max(root_i, root_j)
+        self.parent[other] = root
+        self.dois[root] = doi_i or doi_j
+
+def _union_equal(groups, keys):
+    keys = pd.Series(keys).reset_index(drop=True)
+    valid = keys != ""
+    firsts = pd.Series(np.arange(len(keys)))[valid].groupby(keys[valid]).transform("first")
+    for i, first in firsts[firsts.index != firsts.values].items():
+        groups.union(i, first)
+
+def canonical_keys(df, title_col="Title", link_col="Link", platform_col="Search Platform", doi_col="DOI",
+                   decorated=None):
+    platforms = df[platform_col] if platform_col in df else None
+    link_keys = canonical_urls(df[link_col]).reset_index(drop=True)
+    if doi_col in df:
+        # A recorded DOI beats whatever the link points at
+        doi_keys = canonical_dois(df[doi_col]).reset_index(drop=True)
+        link_keys = doi_keys.where(doi_keys != "", link_keys)
+    title_keys = normalize_titles(df[title_col], platforms, decorated).reset_index(drop=True)
+    long_enough = title_keys.str.count(" ") + 1 >= MIN_TITLE_TOKENS
+    return link_keys, title_keys.where(long_enough & (title_keys != ""), "")
+
+def duplicate_groups(df, title_col="Title", link_col="Link", platform_col="Search Platform",
+                     threshold=NEAR_DUPLICATE_THRESHOLD, decorated=None):
+    # Returns, per row, the position of the first row it duplicates (itself if unique)
+    link_keys, title_keys = canonical_keys(df, title_col, link_col, platform_col, decorated=decorated)
+    # Link keys from a DOI (or an arXiv id) name the paper itself
+    dois = link_keys.where(link_keys.str.startswith(("doi:", "arxiv:")), "")
+    groups = _UnionFind(len(df), dois)
+    _union_equal(groups, link_keys)
+    _union_equal(groups, title_keys)
+
+    # Near-duplicate titles: MinHash/LSH over the distinct normalized titles
+    distinct = title_keys[title_keys != ""].drop_duplicates()
+    if len(distinct) > 1:
+        token_sets = [frozenset(title.split()) for title in distinct]
+        positions = distinct.index.to_numpy()
+        for a, b in _candidate_pairs(minhash_signatures(token_sets)):
+            tokens_a, tokens_b = token_sets[a], token_sets[b]
+            if len(tokens_a & tokens_b) / len(tokens_a | tokens_b) >= threshold:
+                groups.union(int(positions[a]), int(positions[b]))
+
+    return np.array([groups.find(i) for i in range(len(df))])
+
+def dedupe(df, title_col="Title", link_col="Link", platform_col="Search Platform",
+           threshold=NEAR_DUPLICATE_THRESHOLD, decorated=None):
+    if df.empty:
+        return df
+    groups = duplicate_groups(df, title_col, link_col, platform_col, threshold, decorated)
+    return df[groups == np.arange(len(df))]
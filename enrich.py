@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import sqlite3
+from pathlib import Path
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Google Scholar search results only carry a shortened author list and the
+# venue line; scholarly.fill() fetches the full BibTeX record, one request per
+# paper. Fills run in a small pool, only for rows that survived dedup, and are
+# cached by Scholar cluster ID so a paper is never filled twice.
+# Only Authors, Year and Venue are filled: for a search result the fill
+# returns the BibTeX record alone, without the abstract or citation data.
+
+SCHOLAR_PLATFORM = "Google Scholar"
+# Same citation popup scholarly builds for a search result
+SCHOLAR_BIBCITE_URL = "/scholar?hl=en&q=info:{0}:scholar.google.com/&output=cite&scirp=0&hl=en"
+# Scholar starts blocking quickly; stop after this many failed fills in a row
+MAX_CONSECUTIVE_FAILURES = 5
+
+def _workers():
+    return int(os.getenv("MSA_ENRICH_WORKERS", 4))
+
+def _connect():
+    path = Path(os.getenv("MSA_ENRICH_CACHE", "cache/scholar_fill.sqlite"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS filled (
+            pub_id TEXT PRIMARY KEY,
+            bib TEXT NOT NULL,
+            filled_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+def _cached(conn, pub_ids):
+    found = {}
+    pub_ids = list(pub_ids)
+    for start in range(0, len(pub_ids), 500):
+        chunk = pub_ids[start:start + 500]
+        rows = conn.execute(f"SELECT pub_id, bib FROM filled WHERE pub_id IN ({','.join('?' * len(chunk))})", chunk)
+        found.update((pub_id, json.loads(bib)) for pub_id, bib in rows)
+    return found
+
+def _fill(pub_id, title):
+    from scholarly import scholarly
+    from scholarly.data_types import PublicationSource
+    pub = {
+        "container_type": "Publication",
+        "source": PublicationSource.PUBLICATION_SEARCH_SNIPPET,
+        "bib": {"title": title},
+        "url_scholarbib": SCHOLAR_BIBCITE_URL.format(pub_id),
+        "filled": False
+    }
+    return scholarly.fill(pub)["bib"]
+
+def _fields(bib):
+    # BibTeX fields -> our Authors/Year/Venue columns
+    authors = bib.get("author", "")
+    authors = authors.split(" and ") if isinstance(authors, str) else authors
+    venue = bib.get("journal") or bib.get("booktitle") or bib.get("publisher") or bib.get("venue", "")
+    year = str(bib.get("pub_year", ""))
+    return {
+        "Authors": "; ".join(author.strip() for author in authors if author.strip()),
+        "Year": year if year.isdigit() else "",
+        "Venue": "" if venue == "NA" else venue
+    }
+
+def enrich_scholar(df, workers=None):
+    # Fills Authors/Year/Venue of the Google Scholar rows in df; returns a copy
+    if "Source ID" not in df:
+        return df
+    ids = df["Source ID"].fillna("").astype(str)
+    scholar = (df["Search Platform"] == SCHOLAR_PLATFORM) & (ids != "")
+    if not scholar.any():
+        return df
+
+    titles = dict(zip(ids[scholar], df.loc[scholar, "Title"].fillna("").astype(str)))
+    conn = _connect()
+    try:
+        bibs = _cached(conn, titles)
+        missing = [pub_id for pub_id in titles if pub_id not in bibs]
+        print(f"🎓 Enriching {len(titles)} Google Scholar results "
+              f"({len(titles) - len(missing)} cached, {len(missing)} to fetch)...")
+
+        failures = 0
+        with ThreadPoolExecutor(max_workers=workers or _workers()) as executor:
+            futures = {executor.submit(_fill, pub_id, titles[pub_id]): pub_id for pub_id in missing}
+            for future in as_completed(futures):
+                pub_id = futures[future]
+                try:
+                    bib = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"⚠️ Could not fill Scholar result {pub_id}: {e}")
+                    if failures >= MAX_CONSECUTIVE_FAILURES:
+                        print("💡 Tip: Google Scholar may be blocking requests; the rest keep their search metadata.")
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                    continue
+                failures = 0
+                bibs[pub_id] = bib
+                conn.execute("INSERT OR REPLACE INTO filled VALUES (?, ?, ?)",
+                             (pub_id, json.dumps(bib, default=str), time.time()))
+                conn.commit()
+    finally:
+        conn.close()
+
+    df = df.copy()
+    for column in ("Authors", "Year", "Venue"):
+        if column not in df:
+            df[column] = ""
+        df[column] = df[column].astype("string")
+    rows = scholar & ids.isin(list(bibs))
+    fields = [_fields(bibs[pub_id]) for pub_id in ids[rows]]
+    for column in ("Authors", "Year", "Venue"):
+        values = [entry[column] for entry in fields]
+        current = df.loc[rows, column].fillna("")
+        # Keep what the search already had where the fill came back empty
+        df.loc[rows, column] = [new or old for new, old in zip(values, current)]
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce").astype("Int32")
+    print(f"✅ Enriched {int(rows.sum())} Google Scholar results")
+    return df
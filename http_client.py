@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+import ratelimit
+import metrics
+
+# Connections kept alive per host; hosts we page through concurrently get more
+DEFAULT_POOL_SIZE = 10
+HOST_POOL_SIZES = {
+    "www.googleapis.com": 20,
+    "zenodo.org": 10,
+    "api.core.ac.uk": 10,
+    "export.arxiv.org": 10,
+    "doaj.org": 10,
+    "api.openaire.eu": 10,
+    "ipapi.co": 2
+}
+
+# Connections the async client keeps open across all hosts
+ASYNC_MAX_CONNECTIONS = int(os.getenv("MSA_ASYNC_MAX_CONNECTIONS", 100))
+
+# Extra httpx transports for the async client, by URL pattern (httpx
+# "mounts"), e.g. to send the API hosts to a local stand-in
+ASYNC_MOUNTS = {}
+
+_session = None
+_session_lock = threading.Lock()
+_loop = None
+_async_client = None
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {"requests": 0, "connections": 0, "retries": 0})
+
+def _record(host, key):
+    with _stats_lock:
+        _stats[host][key] += 1
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _record(self.host, "connections")
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _record(self.host, "connections")
+        return super()._new_conn()
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        _record(urlsplit(request.url).hostname, "requests")
+        return super().send(request, **kwargs)
+
+def _timeout():
+    return (
+        float(os.getenv("MSA_CONNECT_TIMEOUT", 5)),
+        float(os.getenv("MSA_READ_TIMEOUT", 30))
+    )
+
+def _build_session():
+    session = requests.Session()
+    pool_size = int(os.getenv("MSA_POOL_SIZE", DEFAULT_POOL_SIZE))
+    session.mount("http://", _PooledAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    session.mount("https://", _PooledAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    for host, size in HOST_POOL_SIZES.items():
+        for scheme in ("http", "https"):
+            session.mount(f"{scheme}://{host}/", _PooledAdapter(pool_connections=1, pool_maxsize=size))
+    # urllib3 advertises br (and zstd) only when the decoder is installed
+    session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+    return session
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def request(method, url, timeout=None, **kwargs):
+    # 429s, 5xx responses and dropped connections are retried with backoff;
+    # the last response is returned (or the last error raised) once the
+    # retries run out, so callers still see what went wrong
+    host = urlsplit(url).hostname
+    attempt = 0
+    while True:
+        ratelimit.acquire(host)
+        try:
+            response = get_session().request(method, url, timeout=timeout or _timeout(), **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= ratelimit.max_retries():
+                raise
+            delay = ratelimit.backoff(attempt)
+        else:
+            if not ratelimit.should_retry(response, attempt):
+                ratelimit.record_response(host, response)
+                return response
+            delay = ratelimit.backoff(attempt, response)
+            ratelimit.record_response(host, response, delay)
+            response.close()
+        _record(host, "retries")
+        metrics.count("retries", host=host)
+        attempt += 1
+        time.sleep(delay)
+
+def get_event_loop():
+    # One event loop for every async request, running in a daemon thread;
+    # it outlives a single search so the async client's connections stay warm
+    global _loop
+    with _session_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="msa-event-loop", daemon=True).start()
+    return _loop
+
+def run_async(coroutine):
+    # Schedules coroutine on the shared loop; returns a concurrent.futures.Future
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop())
+
+def get_async_client():
+    # Only called on the shared loop, which the client is bound to
+    global _async_client
+    if _async_client is None:
+        import httpx
+        limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_CONNECTIONS)
+        _async_client = httpx.AsyncClient(limits=limits, follow_redirects=True, mounts=dict(ASYNC_MOUNTS),
+                                          headers={"Accept-Encoding": get_session().headers["Accept-Encoding"]})
+    return _async_client
+
+async def request_async(method, url, timeout=None, **kwargs):
+    # request() on the async client: same pacing, retries and stats, but a
+    # waiting request holds no thread, only a suspended coroutine
+    import httpx
+    host = urlsplit(url).hostname
+    connect, read = timeout or _timeout()
+    attempt = 0
+    while True:
+        await ratelimit.acquire_async(host)
+        _record(host, "requests")
+        try:
+            response = await get_async_client().request(method, url, timeout=httpx.Timeout(read, connect=connect),
+                                                        **kwargs)
+        except httpx.TransportError:
+            if attempt >= ratelimit.max_retries():
+                raise
+            delay = ratelimit.backoff(attempt)
+        else:
+            if not ratelimit.should_retry(response, attempt):
+                ratelimit.record_response(host, response)
+                return response
+            delay = ratelimit.backoff(attempt, response)
+            ratelimit.record_response(host, response, delay)
+        _record(host, "retries")
+        metrics.count("retries", host=host)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def get_pool_stats():
+    with _stats_lock:
+        stats = {}
+        for host, counts in _stats.items():
+            reused = max(counts["requests"] - counts["connections"], 0)
+            stats[host] = {
+                "requests": counts["requests"],
+                "connections": counts["connections"],
+                "reused": reused,
+                "retries": counts["retries"],
+                "hit_rate": reused / counts["requests"] if counts["requests"] else 0.0
+            }
+        return stats
+
+def print_pool_stats():
+    stats = get_pool_stats()
+    if not stats:
+        return
+    print("🔌 Connection reuse:")
+    rates = ratelimit.get_rate_stats()
+    for host, counts in sorted(stats.items()):
+        if counts["connections"]:
+            line = (f"   {host}: {counts['requests']} requests over {counts['connections']} connections "
+                    f"({counts['hit_rate']:.0%} pool hits)")
+        else:
+            # The async client's connections are not counted
+            line = f"   {host}: {counts['requests']} requests"
+        if counts["retries"]:
+            line += f", {counts['retries']} retried"
+        rate = rates.get(host)
+        if rate and rate["throttled"]:
+            line += f", throttled {rate['throttled']}x to {rate['rate_per_minute']:.0f}/min"
+        print(line)
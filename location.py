@@ -0,0 +1,82 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+import http_client
+
+NO_LOCATION = "No location found"
+
+_lock = threading.Lock()
+_cached = None  # (location, resolved_at)
+_override = None
+
+def set_location_override(location):
+    global _override
+    _override = location or None
+
+def _ttl():
+    return float(os.getenv("MSA_LOCATION_TTL", 3600))
+
+def _cache_file():
+    # Set MSA_LOCATION_CACHE to an empty string to disable the on-disk cache
+    path = os.getenv("MSA_LOCATION_CACHE", "cache/location.json")
+    return Path(path) if path else None
+
+def _read_disk_cache():
+    cache_file = _cache_file()
+    if not cache_file or not cache_file.exists():
+        return None
+    try:
+        data = json.loads(cache_file.read_text())
+        if time.time() - data["resolved_at"] < _ttl():
+            return data["location"], data["resolved_at"]
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable location cache: {e}")
+    return None
+
+def _write_disk_cache(location, resolved_at):
+    cache_file = _cache_file()
+    if not cache_file:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"location": location, "resolved_at": resolved_at}))
+    except Exception as e:
+        print(f"⚠️ Could not write location cache: {e}")
+
+def _lookup_location():
+    try:
+        response = http_client.get('https://ipapi.co/json/')
+        if response.status_code == 200:
+            data = response.json()
+            return f"{data.get('city', '')}, {data.get('country_name', '')}"
+        print(f"⚠️ Location lookup failed with status {response.status_code}")
+    except Exception as e:
+        print(f"⚠️ Error getting location: {e}")
+    return None
+
+def get_location():
+    # A static location from the CLI or .env skips the lookup entirely
+    override = _override or os.getenv("MSA_LOCATION")
+    if override:
+        return override
+
+    global _cached
+    with _lock:
+        if _cached and time.time() - _cached[1] < _ttl():
+            return _cached[0]
+
+        _cached = _read_disk_cache()
+        if _cached:
+            return _cached[0]
+
+        location = _lookup_location()
+        resolved_at = time.time()
+        if location:
+            _write_disk_cache(location, resolved_at)
+        else:
+            # Remember the failure for this run too, so we don't retry per result
+            location = NO_LOCATION
+        _cached = (location, resolved_at)
+        return location
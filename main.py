@@ -3,14 +3,24 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="scopus.utils.startup")
 
 import argparse
-from search import perform_search
-from clean import clean_and_format_results
-import inquirer
+from dotenv import load_dotenv
+# Loaded before the imports below, some of which read MSA_* settings
+load_dotenv(override=True)
+
+# Only lightweight modules are imported here; search, clean and inquirer
+# pull in pandas, the provider clients and their dependencies, so they
+# are imported by the commands that need them
+from providers import PROVIDERS as SEARCH_PROVIDERS, MAX_RESULTS_LIMIT
+from writers import OUTPUT_FORMATS
 import os
 from pathlib import Path
 import subprocess
+import sys
+import logging
 
 def create_env_file():
+    import inquirer
+
     env_path = Path('.env')
     if env_path.exists():
         questions = [
@@ -95,6 +105,8 @@ def create_env_file():
         print(f"⚠️ Error during installation: {e}")
 
 def get_tool_selection():
+    import inquirer
+
     # Check if API credentials are available
     has_google_creds = os.getenv("GOOGLE_API_KEY") and os.getenv("GOOGLE_CSE_ID")
     has_core_creds = os.getenv("CORE_API_KEY")
@@ -143,10 +155,12 @@ def get_tool_selection():
         return get_tool_selection()
 
 def get_max_results():
+    import inquirer
+
     questions = [
         inquirer.Text('max_results',
-            message="Enter maximum number of results (1-100)",
-            validate=lambda _, x: x.isdigit() and 1 <= int(x) <= 100
+            message=f"Enter maximum number of results (1-{MAX_RESULTS_LIMIT}, Google is capped at 100)",
+            validate=lambda _, x: x.isdigit() and 1 <= int(x) <= MAX_RESULTS_LIMIT
         ),
     ]
     
@@ -160,28 +174,181 @@ def get_max_results():
         print(f"⚠️ Error during input: {e}")
         return get_max_results()
 
+def read_queries(path):
+    # One query per line; blank lines and lines starting with # are skipped
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+def parse_tools(value):
+    tools = [tool.strip() for tool in value.split(",") if tool.strip()]
+    unknown = [tool for tool in tools if tool not in SEARCH_PROVIDERS]
+    if not tools or unknown:
+        raise argparse.ArgumentTypeError(
+            f"choose from {', '.join(SEARCH_PROVIDERS)} (got {', '.join(unknown) or 'nothing'})")
+    return tools
+
+def parse_max_results(value):
+    if not value.isdigit() or not 1 <= int(value) <= MAX_RESULTS_LIMIT:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_RESULTS_LIMIT}")
+    return int(value)
+
+def configure_logging(level):
+    # Per-request and per-result details are logged under "msa"; nothing is
+    # shown unless a level is given
+    if not level:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger = logging.getLogger("msa")
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+
+def find_results(text, limit, engine=None, rebuild=False):
+    import search_index
+
+    # Result files written outside search/clean (or before the index existed) are indexed first
+    search_index.update(rebuild=rebuild)
+    rows, seconds = search_index.find(text, limit, engine)
+    print(f"\n🔎 {len(rows)} matches for '{text}' in {seconds * 1000:.1f} ms "
+          f"({search_index.count()} results indexed)")
+    for i, row in enumerate(rows, 1):
+        year = f" ({row['year']})" if row["year"] else ""
+        print(f"\n{i}. {row['title']}{year} · {row['engine']}")
+        if row["authors"]:
+            print(f"   👥 {row['authors']}")
+        if row["link"]:
+            print(f"   🔗 {row['link']}")
+        print(f"   {row['snippet']}")
+
 def main():
     parser = argparse.ArgumentParser(description="Multi-Search Engine Aggregator CLI")
     subparsers = parser.add_subparsers(dest="command")
 
+    # Options shared by the search and clean commands
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument("--log-level", choices=["debug", "info", "warning"],
+        default=os.getenv("MSA_LOG_LEVEL", "").lower() or None,
+        help="Log every request and result at this level (default: MSA_LOG_LEVEL or off)")
+    run_options.add_argument("--metrics", type=str, default=None,
+        help="Save run metrics to FILE: Prometheus text for .prom, a JSON report otherwise (default: MSA_METRICS_FILE)")
+
     # Search command
-    search_parser = subparsers.add_parser("search", help="Perform a search query")
-    search_parser.add_argument("query", type=str, help="Search query text")
+    search_parser = subparsers.add_parser("search", parents=[run_options], help="Perform a search query")
+    search_parser.add_argument("query", type=str, nargs="?", help="Search query text")
+    search_parser.add_argument("--queries-file", type=str, default=None,
+        help="Run every query in FILE (one per line, '-' for stdin) and save one combined file")
+    search_parser.add_argument("--tools", type=parse_tools, default=None,
+        help=f"Comma-separated search tools, skipping the prompt ({','.join(SEARCH_PROVIDERS)})")
+    search_parser.add_argument("--max-results", type=parse_max_results, default=None,
+        help=f"Maximum results per tool and query, skipping the prompt (1-{MAX_RESULTS_LIMIT})")
+    search_parser.add_argument("--timeout", type=float, default=None,
+        help="Seconds each search source may run (default: MSA_PROVIDER_TIMEOUT or 120)")
+    search_parser.add_argument("--deadline", type=float, default=None,
+        help="Seconds the whole search may run (default: MSA_SEARCH_DEADLINE or 300, no limit for --queries-file)")
+    search_parser.add_argument("--location", type=str, default=None,
+        help="Location recorded with each result, skipping the IP lookup (default: MSA_LOCATION)")
+    search_parser.add_argument("--no-cache", action="store_true",
+        help="Neither read nor store cached API responses")
+    search_parser.add_argument("--refresh", action="store_true",
+        help="Ignore cached API responses but store the fresh ones")
+    search_parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+        help="Output file format (default: MSA_OUTPUT_FORMAT or parquet)")
+    search_parser.add_argument("--parse-workers", type=int, default=None,
+        help="Parse API pages in this many worker processes (default: MSA_PARSE_WORKERS or 0, in-process)")
+    search_parser.add_argument("--async", dest="use_async", action="store_true",
+        help="Run the searches as tasks on one event loop instead of threads (default: MSA_ASYNC=1)")
 
     # Clean command
-    subparsers.add_parser("clean", help="Clean and deduplicate search result files")
+    clean_parser = subparsers.add_parser("clean", parents=[run_options],
+        help="Clean and deduplicate search result files")
+    clean_parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+        help="Cleaned file format (default: MSA_OUTPUT_FORMAT or parquet)")
+    clean_parser.add_argument("--incremental", action="store_true",
+        help="Only process new result files and append new unique rows to cleaned/cleaned_search_results/")
+    clean_parser.add_argument("--rebuild", action="store_true",
+        help="Reset the incremental clean index and dataset, then run an incremental clean")
+    clean_parser.add_argument("--enrich", action="store_true",
+        help="Fetch full author, year and venue data for the Google Scholar results that survive dedup")
     
+    # Find command
+    find_parser = subparsers.add_parser("find", help="Search all harvested results in the local index")
+    find_parser.add_argument("text", type=str,
+        help='Words to find in titles, descriptions, authors and engines (FTS5 syntax such as "exact phrase", '
+             'prefix* and title:word also works)')
+    find_parser.add_argument("--limit", type=int, default=20, help="Maximum matches to show (default: 20)")
+    find_parser.add_argument("--engine", type=str, default=None, help="Only show results from this search engine")
+    find_parser.add_argument("--rebuild", action="store_true", help="Re-index every result file before searching")
+
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", parents=[run_options],
+        help="Serve search, clean and find over a local HTTP/JSON API")
+    serve_parser.add_argument("--host", type=str, default=None,
+        help="Interface to listen on (default: MSA_SERVE_HOST or 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=None,
+        help="Port to listen on (default: MSA_SERVE_PORT or 8765)")
+
     # Install command
     subparsers.add_parser("install", help="Set up API keys and environment configuration")
 
     args = parser.parse_args()
 
     if args.command == "search":
-        selected_tools = get_tool_selection()
-        max_results = get_max_results()
-        perform_search(args.query, max_results, selected_tools)
+        from search import perform_search, perform_batch_search, set_async_mode
+        from location import set_location_override
+        from response_cache import set_cache_mode
+        import metrics
+
+        if (args.query is None) == (args.queries_file is None):
+            search_parser.error("give either a query or --queries-file")
+        if args.queries_file:
+            queries = read_queries(args.queries_file)
+            if not queries:
+                search_parser.error(f"no queries found in {args.queries_file}")
+        configure_logging(args.log_level)
+        set_location_override(args.location)
+        set_cache_mode(enabled=not args.no_cache, refresh=args.refresh)
+        if args.use_async:
+            set_async_mode()
+        if args.parse_workers is not None:
+            import parse_pool
+            parse_pool.set_workers(args.parse_workers)
+        selected_tools = args.tools or get_tool_selection()
+        max_results = args.max_results or get_max_results()
+        # The metrics are also saved when Ctrl+C ends the search early
+        try:
+            if args.queries_file:
+                perform_batch_search(queries, max_results, selected_tools,
+                                     provider_timeout=args.timeout, deadline=args.deadline, output_format=args.format)
+            else:
+                perform_search(args.query, max_results, selected_tools,
+                               provider_timeout=args.timeout, deadline=args.deadline, output_format=args.format)
+        finally:
+            metrics.write_report(args.metrics)
     elif args.command == "clean":
-        clean_and_format_results()
+        from clean import clean_and_format_results
+        import metrics
+
+        configure_logging(args.log_level)
+        try:
+            clean_and_format_results(output_format=args.format, incremental=args.incremental, rebuild=args.rebuild,
+                                     enrich=args.enrich)
+        finally:
+            metrics.write_report(args.metrics)
+    elif args.command == "serve":
+        from service import serve
+        import metrics
+
+        configure_logging(args.log_level)
+        try:
+            serve(args.host, args.port)
+        finally:
+            metrics.write_report(args.metrics)
+    elif args.command == "find":
+        find_results(args.text, args.limit, args.engine, args.rebuild)
     elif args.command == "install":
         print("\n🔧 Setting up virtual environment and installing dependencies...")
         
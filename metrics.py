@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import bisect
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from collections import defaultdict
+
+# Counters and latency histograms for one run, keyed by metric name and
+# labels (provider, host, stage, format). They are collected in memory at
+# every stage of the pipeline and written out at the end of a command, as
+# a JSON run report or as Prometheus text (see write_report).
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Prometheus names are the metric names with this prefix
+PROMETHEUS_PREFIX = "msa_"
+
+HELP = {
+    "request_seconds": "HTTP request latency per provider, until the response headers arrive",
+    "response_bytes": "Response body bytes received per provider (cache hits excluded)",
+    "cache_hits": "API pages served from the response cache",
+    "cache_misses": "API pages requested from the API",
+    "parse_seconds": "Time spent parsing API pages and building result records",
+    "provider_seconds": "Time each (query, provider) job ran",
+    "rows": "Results produced per provider",
+    "retries": "HTTP requests retried per host",
+    "write_seconds": "Time spent writing result batches and closing the output file",
+    "rows_written": "Rows written to output files",
+    "stage_seconds": "Wall time of each pipeline stage",
+    "coalesced": "API requests that shared an identical request already in flight",
+    "memo_rows": "Results served from earlier runs instead of the API",
+    "serve_seconds": "Time ./msa serve took to answer a request, per route",
+    "serve_coalesced": "Searches that waited for an identical running search",
+    "serve_memory_hits": "Searches answered from the in-memory response cache"
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}
+_started = time.time()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def count(name, value=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+def observe(name, seconds, **labels):
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        if histogram is None:
+            histogram = _histograms[_key(name, labels)] = {"counts": [0] * (len(LATENCY_BUCKETS) + 1),
+                                                          "sum": 0.0, "count": 0, "max": 0.0}
+        histogram["counts"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+        histogram["max"] = max(histogram["max"], seconds)
+
+@contextmanager
+def timer(name, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+def reset():
+    global _started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started = time.time()
+
+def _quantile(histogram, q):
+    # Upper bound of the bucket holding the q-th observation
+    rank = q * histogram["count"]
+    seen = 0
+    for bound, bucket in zip(LATENCY_BUCKETS + (histogram["max"],), histogram["counts"]):
+        seen += bucket
+        if seen >= rank:
+            return round(min(bound, histogram["max"]), 6)
+    return histogram["max"]
+
+def _snapshot():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {"counts": list(h["counts"]), "sum": h["sum"], "count": h["count"], "max": h["max"]}
+                      for key, h in _histograms.items()}
+    return counters, histograms
+
+def report():
+    # The run as a JSON-friendly dict: a per-provider summary, every metric
+    # with its labels, and the connection pool, cache and rate limit stats
+    import http_client
+    import ratelimit
+    import response_cache
+    counters, histograms = _snapshot()
+
+    providers = defaultdict(dict)
+    for (name, labels), value in counters.items():
+        labels = dict(labels)
+        if "provider" in labels:
+            providers[labels["provider"]][name] = int(value)
+    for (name, labels), histogram in histograms.items():
+        labels = dict(labels)
+        if "provider" in labels:
+            summary = providers[labels["provider"]]
+            summary[name] = round(histogram["sum"], 6)
+            if name == "request_seconds":
+                summary["requests"] = histogram["count"]
+                summary["request_p50_s"] = _quantile(histogram, 0.5)
+                summary["request_p95_s"] = _quantile(histogram, 0.95)
+                summary["request_max_s"] = round(histogram["max"], 6)
+
+    return {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_started)),
+        "duration_s": round(time.time() - _started, 3),
+        "stages": {dict(labels)["stage"]: round(histogram["sum"], 6)
+                   for (name, labels), histogram in histograms.items() if name == "stage_seconds"},
+        "providers": dict(providers),
+        "counters": [{"name": name, "labels": dict(labels), "value": value}
+                     for (name, labels), value in sorted(counters.items())],
+        "histograms": [{"name": name, "labels": dict(labels), "count": histogram["count"],
+                        "sum": histogram["sum"], "max": histogram["max"],
+                        "buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"],
+                                            histogram["counts"]))}
+                       for (name, labels), histogram in sorted(histograms.items())],
+        "http": http_client.get_pool_stats(),
+        "cache": response_cache.get_cache_stats(),
+        "rate_limits": ratelimit.get_rate_stats()
+    }
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels, **extra):
+    labels = list(labels) + list(extra.items())
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def prometheus_text():
+    # Prometheus text exposition format: counters as *_total, histograms
+    # as cumulative *_bucket series plus *_sum and *_count
+    counters, histograms = _snapshot()
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        metric = f"{PROMETHEUS_PREFIX}{name}_total"
+        lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} counter")
+        for (series, labels), value in sorted(counters.items()):
+            if series == name:
+                lines.append(f"{metric}{_labels(labels)} {value:g}")
+    for name in sorted({name for name, _ in histograms}):
+        metric = f"{PROMETHEUS_PREFIX}{name}"
+        lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (series, labels), histogram in sorted(histograms.items()):
+            if series != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip([f"{bound:g}" for bound in LATENCY_BUCKETS] + ["+Inf"], histogram["counts"]):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+def write_report(path=None):
+    # A .prom file gets Prometheus text, anything else the JSON run report
+    path = path or os.getenv("MSA_METRICS_FILE")
+    if not path:
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".prom":
+        path.write_text(prometheus_text(), encoding="utf-8")
+    else:
+        path.write_text(json.dumps(report(), indent=2, default=str), encoding="utf-8")
+    print(f"📈 Run metrics saved to {path}")
+    return path
@@ -0,0 +1,159 @@
+import html
+import pandas as pd
+from dedup import DOI_PATTERN, ARXIV_CATEGORY_SUFFIX
+from results import AUTHOR_SEPARATOR
+
+# The clean pipeline's normalization stage: tidies the text columns and
+# fills in DOI, Year, Authors and Venue where a result file left them
+# empty, from the link, the description and the decorations older result
+# files put in titles. Every step is a pandas .str operation over the whole
+# column (compiled regex, Arrow-backed strings); only the few values with
+# HTML entities are unescaped one by one.
+
+# Older Scholar titles: "Title (2021) - Venue"
+SCHOLAR_DECORATION = r"^(?P<title>.*?) \((?P<year>(?:1[89]|20)\d{2})\)(?: - (?P<venue>.*))?$"
+# Other older titles: "Title - Venue" ("Title - Creators" on Zenodo)
+VENUE_DECORATION = r"^(?P<title>.*) - (?P<venue>.*)$"
+# CORE and DOAJ always appended the journal or publisher, so their last
+# " - " is always the decoration; Zenodo always appended the creators
+ALWAYS_VENUE_PLATFORMS = ["CORE", "DOAJ"]
+CREATORS_PLATFORM = "Zenodo"
+# OpenAIRE (and Scholar, without a year) only appended a venue when they
+# had one, so a " - " in those titles is only split off when what follows
+# it looks like a venue, not in "COVID-19 - a review"
+VENUE_SHAPE = (r"\b(?:Journal|Proceedings|Conference|Congress|Symposium|Workshop|Reviews?|Letters|Transactions|"
+               r"Bulletin|Annals|Archives|Magazine|Quarterly|Acta|Revista|Zeitschrift|Press|Publishing|"
+               r"Publishers?|Publications|Verlag|University|Institute|Society|Association|Academy|Elsevier|"
+               r"Springer|Wiley|MDPI|IEEE|ACM|Frontiers|SAGE|Hindawi|PLOS|Nature|Science|arXiv|bioRxiv|"
+               r"medRxiv|SSRN|Zenodo)\b|, (?:19|20)\d{2}$|\.(?:com|org|net|edu)\b")
+# Older descriptions start with "Authors: a, b" ("Unknown Author" when there were none)
+AUTHORS_PREFIX = r"^Authors: (?!Unknown Author)([^\n]+)"
+# A year in a description only counts when it is labelled as one
+DESCRIPTION_YEAR = r"(?i)(?:published|publication date|year|©|\(c\))\W{0,3}((?:19|20)\d{2})\b"
+
+# What older titles say when there was no journal, publisher or author
+PLACEHOLDER_VENUES = ["Unknown Journal", "Unknown Publisher"]
+PLACEHOLDER_AUTHOR = "Unknown Author"
+
+ENTITY = r"&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z]+);"
+TAG = r"<[^>]+>"
+
+def _text(values):
+    return values.fillna("").astype(str)
+
+def _on(values, mask, transform):
+    # transform(values[mask]) replaces those rows; the expensive steps only
+    # run on the rows a cheap vectorized test picked out
+    if not mask.any():
+        return values
+    values = values.copy()
+    values[mask] = transform(values[mask])
+    return values
+
+def clean_text(values):
+    # HTML tags and entities removed, whitespace collapsed
+    values = _text(values)
+    values = _on(values, values.str.contains("<", regex=False), lambda v: v.str.replace(TAG, " ", regex=True))
+    values = _on(values, values.str.contains(ENTITY, regex=True), lambda v: v.map(html.unescape))
+    values = _on(values, values.str.contains(r"\s\s|[^\S ]", regex=True),
+                 lambda v: v.str.replace(r"\s+", " ", regex=True))
+    return values.str.strip()
+
+def extract_dois(values):
+    # The first DOI in each value, as extract_doi in dedup.py finds it
+    values = _text(values)
+    values = _on(values, values.str.contains("%2F", case=False, regex=False),
+                 lambda v: v.str.replace("%2F", "/", case=False, regex=False))
+    dois = pd.Series("", index=values.index, dtype="str")
+    found = values.str.contains(r"10\.\d{4,9}/", regex=True)
+    if found.any():
+        dois[found] = (values[found].str.extract(f"({DOI_PATTERN.pattern})", flags=DOI_PATTERN.flags, expand=False)
+                       .fillna("").str.rstrip(".,;)]").str.lower())
+    return dois
+
+def split_authors(values):
+    # "a, b, c" author lists -> "a; b; c". A list of "Last, First" names
+    # (an even number of parts, some of them a single word) is split
+    # between the pairs instead, and one that could be either is kept whole.
+    values = _text(values)
+    listed = values.str.contains(", ", regex=False)
+    single_words = values.str.contains(r"(?:^|, )[^\s,]+(?:, |$)", regex=True)
+    paired = listed & single_words & (values.str.count(", ") % 2 == 1)
+    values = _on(values, listed & ~single_words, lambda v: v.str.replace(", ", AUTHOR_SEPARATOR, regex=False))
+    values = _on(values, paired, lambda v: v.str.replace(r"([^,]+, [^,]+), ", r"\1" + AUTHOR_SEPARATOR, regex=True))
+    # "Unknown Author" entries are dropped
+    placeholder = f"(^|{AUTHOR_SEPARATOR}){PLACEHOLDER_AUTHOR}(?={AUTHOR_SEPARATOR}|$)"
+    return _on(values, values.str.contains(PLACEHOLDER_AUTHOR, regex=False),
+               lambda v: v.str.replace(placeholder, "", regex=True).str.replace(f"^{AUTHOR_SEPARATOR}", "", regex=True))
+
+def split_decorations(titles, platforms, decorated):
+    # (titles, years, venues, authors) with the venue/year/category/creator
+    # decorations of older result files moved out of the titles; decorated
+    # marks their rows
+    titles = _text(titles)
+    platforms = _text(platforms).where(pd.Series(decorated, index=titles.index).astype(bool), "")
+    years = pd.Series("", index=titles.index, dtype="str")
+    venues = pd.Series("", index=titles.index, dtype="str")
+    authors = pd.Series("", index=titles.index, dtype="str")
+
+    titles = _on(titles, platforms == "arXiv", lambda v: v.str.replace(ARXIV_CATEGORY_SUFFIX, "", regex=True))
+
+    scholar = platforms == "Google Scholar"
+    parts = titles[scholar].str.extract(SCHOLAR_DECORATION)
+    dated = parts.index[parts["title"].notna()]
+    titles.loc[dated] = parts.loc[dated, "title"]
+    years.loc[dated] = parts.loc[dated, "year"]
+    venues.loc[dated] = parts.loc[dated, "venue"].fillna("")
+
+    # Scholar titles without a year may still carry " - venue"
+    hyphenated = titles.str.contains(" - ", regex=False)
+    maybe_venue = (platforms == "OpenAIRE") | (scholar & ~titles.index.isin(dated))
+    parts = titles[hyphenated & (platforms.isin(ALWAYS_VENUE_PLATFORMS) | maybe_venue)].str.extract(VENUE_DECORATION)
+    parts = parts[parts["venue"].str.contains(VENUE_SHAPE, regex=True) | ~maybe_venue[parts.index]]
+    titles.loc[parts.index] = parts["title"]
+    venues.loc[parts.index] = parts["venue"]
+
+    parts = titles[hyphenated & (platforms == CREATORS_PLATFORM)].str.extract(VENUE_DECORATION)
+    titles.loc[parts.index] = parts["title"]
+    authors.loc[parts.index] = split_authors(parts["venue"])
+    return titles, years, venues.where(~venues.isin(PLACEHOLDER_VENUES), ""), authors
+
+def _fill(values, fallback):
+    # Empty values take the fallback's
+    values = _text(values)
+    return values.where(values != "", fallback)
+
+def normalize_results(df, decorated=None, description_col="Description"):
+    # df has the cleaned columns (Search Platform, Title, Link, DOI, Year,
+    # Authors, Venue) and optionally the result description, which is only
+    # read; decorated marks the rows from older result files
+    if df.empty:
+        return df
+    df = df.copy()
+    decorated = pd.Series(False, index=df.index) if decorated is None else decorated
+    no_description = pd.Series("", index=df.index, dtype="str")
+    description = _text(df[description_col]) if description_col in df else no_description
+
+    titles, decoration_years, decoration_venues, decoration_authors = split_decorations(
+        df["Title"], df["Search Platform"], decorated)
+    df["Title"] = clean_text(titles)
+
+    dois = _text(df["DOI"]).str.strip().str.lower()
+    dois = _on(dois, dois == "", lambda missing: extract_dois(df["Link"][missing.index]))
+    df["DOI"] = _on(dois, dois == "", lambda missing: extract_dois(description[missing.index]))
+
+    years = decoration_years.copy()
+    labelled = (years == "") & df["Year"].isna() & description.str.contains(r"(?i)publi|year|©|\(c\)", regex=True)
+    if labelled.any():
+        years[labelled] = description[labelled].str.extract(DESCRIPTION_YEAR, expand=False).fillna("")
+    df["Year"] = df["Year"].astype("Int32").fillna(pd.to_numeric(years, errors="coerce").astype("Int32"))
+
+    authors = _text(df["Authors"])
+    listed = (authors == "") & description.str.startswith("Authors: ")
+    if listed.any():
+        authors = authors.copy()
+        authors[listed] = split_authors(description[listed].str.extract(AUTHORS_PREFIX, expand=False))
+    df["Authors"] = clean_text(_fill(authors, decoration_authors))
+    venues = clean_text(_fill(df["Venue"], decoration_venues))
+    df["Venue"] = venues.where(~venues.isin(PLACEHOLDER_VENUES), "")
+    return df
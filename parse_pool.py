@@ -0,0 +1,73 @@
+import os
+import time
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Parses API pages in worker processes. Deep harvests spend most of their
+# CPU time decoding JSON/XML, stripping HTML and building records, all of
+# it under the GIL; with MSA_PARSE_WORKERS (or search --parse-workers) set,
+# each page's raw body goes to a pool of processes and comes back as
+# compact SearchResult records, so parsing scales with the cores. Off (0)
+# by default: for a few small pages the round trip costs more than it saves.
+
+_lock = threading.Lock()
+_pool = None
+_workers = int(os.getenv("MSA_PARSE_WORKERS", 0))
+
+def set_workers(count):
+    global _workers
+    _workers = count
+
+def enabled():
+    return _workers > 0
+
+def window():
+    # Pages a harvest keeps in flight: one per worker, plus the one being fetched
+    return _workers + 1
+
+def can_offload(*functions):
+    # Only module-level functions can be sent to a worker (by name)
+    return all("<" not in function.__qualname__ for function in functions)
+
+def _ignore_interrupt():
+    # Ctrl+C is handled by the main process, which saves what it has
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the parent has provider threads and an event
+            # loop running, which a forked child would inherit mid-state
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=get_context("spawn"),
+                                        initializer=_ignore_interrupt)
+    return _pool
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+def _parse(parse_page, make_result, content, encoding, query, location, offset, max_results, start):
+    # Runs in a worker: (results, errors, items received, total, seconds)
+    from response_cache import CachedResponse
+    from providers.common import page_results
+    started = time.perf_counter()
+    items, total = parse_page(CachedResponse(200, content, encoding))
+    page = {}
+    results, errors = [], []
+    for _, result in page_results(items, make_result, query, location, offset, max_results, start, page):
+        if isinstance(result, Exception):
+            errors.append(str(result))
+        else:
+            results.append(result)
+    return results, errors, page["received"], total, time.perf_counter() - started
+
+def submit(parse_page, make_result, response, query, location, offset, max_results, start):
+    # A concurrent.futures.Future for the page's _parse() outcome
+    return _get_pool().submit(_parse, parse_page, make_result, response.content, response.encoding, query,
+                              location, offset, max_results, start)
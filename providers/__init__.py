@@ -0,0 +1,61 @@
+import os
+import inspect
+import importlib
+
+# Search tools by key, as "module:function". A provider module is only
+# imported when its tool is used, so the heavy clients (scholarly, DDGS)
+# never slow down commands that don't search with them. The function takes
+# (query, max_results) and returns an iterator of result batches; paging
+# providers also take start=N to skip the first N results (see result_memo.py).
+# A provider can have an async twin next to it, named with an "a" in front
+# (iter_zenodo -> aiter_zenodo), returning an async iterator of batches;
+# the async search mode (search.py, MSA_ASYNC=1) runs the others in threads.
+PROVIDERS = {
+    "google": "providers.google:iter_google",
+    "duckduckgo": "providers.duckduckgo:iter_duckduckgo",
+    "google_scholar": "providers.scholar:iter_google_scholar",
+    "zenodo": "providers.zenodo:iter_zenodo",
+    "researchgate": "providers.google:iter_researchgate",
+    "doaj": "providers.doaj:iter_doaj",
+    "core": "providers.core:iter_core",
+    "openaire": "providers.openaire:iter_openaire",
+    "arxiv": "providers.arxiv:iter_arxiv"
+}
+
+# Upper bound for max_results on the deep-paging providers
+MAX_RESULTS_LIMIT = int(os.getenv("MSA_MAX_RESULTS_LIMIT", 10000))
+
+def register_provider(key, target):
+    PROVIDERS[key] = target
+
+def _register_plugins():
+    # Extra providers from the environment: MSA_PROVIDER_PLUGINS="key=package.module:function,..."
+    for entry in os.getenv("MSA_PROVIDER_PLUGINS", "").split(","):
+        key, _, target = entry.partition("=")
+        if key.strip() and target.strip():
+            register_provider(key.strip(), target.strip())
+
+def load_provider(key):
+    module_name, _, function = PROVIDERS[key].partition(":")
+    return getattr(importlib.import_module(module_name), function)
+
+def has_async_provider(key):
+    module_name, _, function = PROVIDERS[key].partition(":")
+    return hasattr(importlib.import_module(module_name), "a" + function)
+
+def load_async_provider(key):
+    module_name, _, function = PROVIDERS[key].partition(":")
+    module = importlib.import_module(module_name)
+    native = getattr(module, "a" + function, None)
+    if native is not None:
+        return native
+
+    # Library clients (DDGS, scholarly) and plugins block, so their batches
+    # are produced in worker threads
+    from providers.common import threaded
+    search = getattr(module, function)
+    if "start" in inspect.signature(search).parameters:
+        return lambda query, max_results, start=0: threaded(search(query, max_results, start=start))
+    return lambda query, max_results: threaded(search(query, max_results))
+
+_register_plugins()
@@ -0,0 +1,128 @@
+from datetime import datetime
+from itertools import chain
+from xml.etree import ElementTree as ET
+from providers.common import STREAM_BATCH_SIZE
+from results import SearchResult
+from providers.common import guarded, aguarded, collect, iter_pages, aiter_pages
+
+ARXIV_URL = "http://export.arxiv.org/api/query"
+ARXIV_NS = {'atom': 'http://www.w3.org/2005/Atom',
+            'arxiv': 'http://arxiv.org/schemas/atom',
+            'opensearch': 'http://a9.com/-/spec/opensearch/1.1/'}
+# arXiv accepts larger pages than the other APIs but asks for a few seconds between calls
+ARXIV_PAGE_SIZE = 500
+# Bytes fed to the XML parser at a time while the feed downloads
+ARXIV_CHUNK_SIZE = 64 * 1024
+
+ENTRY_TAG = f"{{{ARXIV_NS['atom']}}}entry"
+TOTAL_TAG = f"{{{ARXIV_NS['opensearch']}}}totalResults"
+
+def _iter_feed(response):
+    # Parses the feed as it downloads, yielding ("total", n) and then
+    # ("entry", element) pairs; an entry is dropped from the tree as soon
+    # as the caller moves on, so memory stays flat however long the page
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    try:
+        for chunk in response.iter_content(ARXIV_CHUNK_SIZE):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = element
+                elif element.tag == TOTAL_TAG:
+                    yield "total", int(element.text)
+                elif element.tag == ENTRY_TAG:
+                    yield "entry", element
+                    root.remove(element)
+        parser.close()
+    finally:
+        response.close()
+
+def _parse_arxiv_page(response):
+    # The total comes before the first entry; everything after it is
+    # still being downloaded when the entries are handed out
+    feed = _iter_feed(response)
+    total = None
+    first = []
+    for kind, value in feed:
+        if kind == "total":
+            total = value
+        else:
+            first.append(value)
+        break
+    entries = (value for kind, value in feed if kind == "entry")
+    return chain(first, entries), total
+
+def _arxiv_result(entry, query, location):
+    ns = ARXIV_NS
+
+    # Get title
+    title = entry.find('atom:title', ns).text.strip()
+
+    # Get authors
+    authors = entry.findall('.//atom:author/atom:name', ns)
+    author_names = [author.text for author in authors]
+
+    # Get abstract
+    abstract = entry.find('atom:summary', ns).text.strip()
+    if abstract:
+        abstract = abstract.replace('\n', ' ').strip()
+
+    # Get links
+    links = entry.findall('atom:link', ns)
+    pdf_link = ''
+    doi_link = ''
+    for link in links:
+        if link.get('title') == 'pdf':
+            pdf_link = link.get('href')
+        elif link.get('title') == 'doi':
+            doi_link = link.get('href')
+
+    # Get primary category
+    primary_category = entry.find('arxiv:primary_category', ns).get('term', '')
+
+    # Get published date
+    published = entry.find('atom:published', ns).text
+
+    return SearchResult(
+        "arXiv",
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        pdf_link,
+        title,
+        abstract,
+        authors=author_names,
+        year=published,
+        doi=doi_link.split('doi.org/', 1)[-1] if doi_link else '',
+        category=primary_category,
+        source_id=entry.find('atom:id', ns).text.rsplit('/abs/', 1)[-1]
+    )
+
+def _arxiv_pages(pages, query, max_results, start):
+    # pages is iter_pages or aiter_pages; the async one reads each page
+    # in full and parses it from memory
+    def request_page(offset, size):
+        params = {
+            'search_query': f'all:{query}',
+            'start': offset,
+            'max_results': size,
+            'sortBy': 'submittedDate',
+            'sortOrder': 'descending'
+        }
+        return "GET", ARXIV_URL, {"stream": True, "params": params}
+
+    return pages("arXiv", query, max_results, ARXIV_PAGE_SIZE, request_page, _parse_arxiv_page, _arxiv_result,
+                 batch_size=STREAM_BATCH_SIZE, start=start, any_offset=True)
+
+def iter_arxiv(query, max_results, start=0):
+    print("📚 Searching arXiv...")
+    return guarded("arXiv", _arxiv_pages(iter_pages, query, max_results, start))
+
+def aiter_arxiv(query, max_results, start=0):
+    print("📚 Searching arXiv...")
+    return aguarded("arXiv", _arxiv_pages(aiter_pages, query, max_results, start))
+
+def search_arxiv(query, max_results):
+    return collect(iter_arxiv(query, max_results))
@@ -0,0 +1,291 @@
+import time
+import asyncio
+import logging
+from itertools import islice
+from collections import deque
+import requests
+from location import get_location
+import metrics
+import parse_pool
+import response_cache
+
+# Per-request and per-result details; off unless logging is enabled
+# (main.py --log-level or MSA_LOG_LEVEL)
+logger = logging.getLogger("msa.providers")
+
+# Results handed to the writer at a time by the one-by-one providers
+STREAM_BATCH_SIZE = 10
+
+# Per-request page cap for Zenodo, DOAJ, CORE and OpenAIRE
+API_PAGE_SIZE = 100
+
+def guarded(name, batches, tip=None):
+    # A failing provider ends its own stream instead of the whole run
+    count = 0
+    try:
+        for batch in batches:
+            count += len(batch)
+            yield batch
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Network error: {e}")
+    except Exception as e:
+        print(f"❌ {name} search failed: {e}")
+        if tip:
+            print(f"💡 Tip: {tip}")
+
+    print(f"✅ Found {count} results from {name}")
+
+async def aguarded(name, batches, tip=None):
+    # guarded() for the async providers
+    import httpx
+    count = 0
+    try:
+        async for batch in batches:
+            count += len(batch)
+            yield batch
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        print(f"❌ Network error: {e}")
+    except Exception as e:
+        print(f"❌ {name} search failed: {e}")
+        if tip:
+            print(f"💡 Tip: {tip}")
+
+    print(f"✅ Found {count} results from {name}")
+
+async def threaded(batches):
+    # A blocking provider (DDGS, scholarly) on the event loop: each batch is
+    # produced in a worker thread while the loop keeps serving the others
+    batches = iter(batches)
+    while True:
+        batch = await asyncio.to_thread(next, batches, None)
+        if batch is None:
+            return
+        yield batch
+
+async def aiter_empty():
+    # An async provider with nothing to search (e.g. a missing API key)
+    return
+    yield
+
+def collect(batches):
+    return [row for batch in batches for row in batch]
+
+def _page_failed(response, tips):
+    if response.status_code == 200:
+        return False
+    print(f"❌ Error response: {response.text}")
+    tip = (tips or {}).get(response.status_code)
+    if tip is None and response.status_code == 429:
+        tip = "Rate limit reached. Try again later."
+    if tip:
+        print(f"💡 Tip: {tip}")
+    return True
+
+def page_results(items, make_result, query, location, offset, max_results, start, page):
+    # Yields (position, result) for a page's items past start; result is the
+    # exception when make_result failed. Sets page["received"].
+    received = 0
+    for i, item in enumerate(islice(items, max_results - offset), offset + 1):
+        received += 1
+        if i <= start:
+            continue
+        try:
+            result = make_result(item, query, location)
+        except Exception as e:
+            result = e
+        yield i, result
+    # Read what's left of a streamed page, so it ends up in the cache
+    for _ in items:
+        pass
+    page["received"] = received
+
+def _page_batches(name, query, location, response, parse_page, make_result, offset, max_results, start,
+                  batch_size, page):
+    # One API page -> result batches; sets page["received"] and page["total"]
+    provider = name.lower()
+    # Parse time is only counted while this generator runs, not while
+    # the consumer holds a batch (for a streamed page it includes the download)
+    started = time.perf_counter()
+    items, total = parse_page(response)
+    page["total"] = total
+    expected = min(max_results, total) if total is not None else max_results
+    batch = []
+    for i, result in page_results(items, make_result, query, location, offset, max_results, start, page):
+        if isinstance(result, Exception):
+            print(f"⚠️ Error processing {name} result: {result}")
+            continue
+        logger.debug("%s result %d/%d: %s <%s>", name, i, expected, result.title, result.link)
+        batch.append(result)
+        if batch_size and len(batch) >= batch_size:
+            metrics.observe("parse_seconds", time.perf_counter() - started, provider=provider)
+            yield batch
+            started = time.perf_counter()
+            batch = []
+    metrics.observe("parse_seconds", time.perf_counter() - started, provider=provider)
+    if batch:
+        yield batch
+
+def _pooled_batch(name, outcome, offset, page):
+    # A page parsed by parse_pool -> its results; sets page["received"] and page["total"]
+    results, errors, page["received"], page["total"], seconds = outcome
+    metrics.observe("parse_seconds", seconds, provider=name.lower())
+    for error in errors:
+        print(f"⚠️ Error processing {name} result: {error}")
+    for i, result in enumerate(results, offset + 1):
+        logger.debug("%s result %d: %s <%s>", name, i, result.title, result.link)
+    return results
+
+def _first_offset(max_results, page_size, start, any_offset):
+    page_size = min(max_results, page_size)
+    return page_size, start if any_offset else start - start % page_size
+
+def _last_page(offset, page_size, page):
+    return page["received"] < page_size or (page["total"] is not None and offset >= page["total"])
+
+def _request_page(name, query, offset, page_size, request_page, read_in_full):
+    logger.debug("%s request (offset=%d)", name, offset)
+    method, url, kwargs = request_page(offset, page_size)
+    if read_in_full:
+        kwargs = {key: value for key, value in kwargs.items() if key != "stream"}
+    response = response_cache.cached_request(name.lower(), query, offset, page_size, method, url, **kwargs)
+    logger.debug("%s response status: %d", name, response.status_code)
+    return response
+
+async def _arequest_page(name, query, offset, page_size, request_page):
+    logger.debug("%s request (offset=%d)", name, offset)
+    method, url, kwargs = request_page(offset, page_size)
+    kwargs = {key: value for key, value in kwargs.items() if key != "stream"}
+    response = await response_cache.cached_request_async(name.lower(), query, offset, page_size, method, url,
+                                                         **kwargs)
+    logger.debug("%s response status: %d", name, response.status_code)
+    return response
+
+class _PooledPages:
+    # Pages parsed by parse_pool while the next ones are fetched: up to
+    # parse_pool.window() pages in flight, handed back in page order. Until
+    # a page has said how many results there are, nothing is fetched ahead
+    # of it, so a harvest never asks for pages past the end.
+    def __init__(self, name, query, location, max_results, page_size, offset, parse_page, make_result, start):
+        self.name, self.query, self.location = name, query, location
+        self.max_results, self.page_size, self.offset, self.start = max_results, page_size, offset, start
+        self.parse_page, self.make_result = parse_page, make_result
+        self.end = max_results
+        self.ahead = 1
+        self.in_flight = deque()
+
+    def wants_page(self):
+        return self.offset < self.end and len(self.in_flight) < self.ahead
+
+    def add(self, response):
+        self.in_flight.append((self.offset, parse_pool.submit(self.parse_page, self.make_result, response,
+                                                              self.query, self.location, self.offset,
+                                                              self.max_results, self.start)))
+        self.offset += self.page_size
+
+    def failed(self):
+        # The page at self.offset failed; the pages before it still count
+        self.end = self.offset
+
+    def done(self, page_offset, outcome):
+        # (the page's batch, whether it was the last page)
+        page = {}
+        batch = _pooled_batch(self.name, outcome, page_offset, page)
+        if page["total"] is not None:
+            self.end, self.ahead = min(self.end, page["total"]), parse_pool.window()
+        return batch, _last_page(page_offset + self.page_size, self.page_size, page)
+
+    def cancel(self):
+        for _, future in self.in_flight:
+            future.cancel()
+
+def iter_pages(name, query, max_results, page_size, request_page, parse_page, make_result, tips=None,
+               batch_size=None, start=0, any_offset=False):
+    # Yields one batch of results per API page (or per batch_size results),
+    # so deep pulls never hold more than a page of raw response in memory.
+    # request_page(offset, size) returns the page's (method, url, kwargs).
+    # parse_page may return its items as an iterator to stream a page.
+    # start skips results an earlier run already has: APIs that take any
+    # offset resume right after them, page-number APIs at the page holding
+    # result start + 1
+    # With parse_pool on, pages are read in full and parsed in worker
+    # processes while the following pages are fetched
+    location = get_location()
+    page_size, offset = _first_offset(max_results, page_size, start, any_offset)
+    if parse_pool.enabled() and parse_pool.can_offload(parse_page, make_result):
+        pages = _PooledPages(name, query, location, max_results, page_size, offset, parse_page, make_result, start)
+        try:
+            while True:
+                while pages.wants_page():
+                    response = _request_page(name, query, pages.offset, page_size, request_page, True)
+                    if _page_failed(response, tips):
+                        pages.failed()
+                        break
+                    pages.add(response)
+                if not pages.in_flight:
+                    return
+                page_offset, future = pages.in_flight.popleft()
+                batch, last = pages.done(page_offset, future.result())
+                if batch:
+                    yield batch
+                if last:
+                    return
+        finally:
+            pages.cancel()
+
+    while offset < max_results:
+        response = _request_page(name, query, offset, page_size, request_page, False)
+        if _page_failed(response, tips):
+            return
+        page = {}
+        yield from _page_batches(name, query, location, response, parse_page, make_result, offset,
+                                 max_results, start, batch_size, page)
+        offset += page_size
+        if _last_page(offset, page_size, page):
+            return
+
+async def aiter_pages(name, query, max_results, page_size, request_page, parse_page, make_result, tips=None,
+                      batch_size=None, start=0, any_offset=False):
+    # iter_pages() on the event loop, for the async providers. Pages are
+    # read in full before they are parsed (stream=True is dropped).
+    location = get_location()
+    page_size, offset = _first_offset(max_results, page_size, start, any_offset)
+    if parse_pool.enabled() and parse_pool.can_offload(parse_page, make_result):
+        # The loop keeps serving the other providers while the workers parse
+        pages = _PooledPages(name, query, location, max_results, page_size, offset, parse_page, make_result, start)
+        try:
+            while True:
+                while pages.wants_page():
+                    response = await _arequest_page(name, query, pages.offset, page_size, request_page)
+                    if _page_failed(response, tips):
+                        pages.failed()
+                        break
+                    pages.add(response)
+                if not pages.in_flight:
+                    return
+                page_offset, future = pages.in_flight.popleft()
+                batch, last = pages.done(page_offset, await asyncio.wrap_future(future))
+                if batch:
+                    yield batch
+                if last:
+                    return
+        finally:
+            pages.cancel()
+
+    while offset < max_results:
+        response = await _arequest_page(name, query, offset, page_size, request_page)
+        if _page_failed(response, tips):
+            return
+        page = {}
+        for batch in _page_batches(name, query, location, response, parse_page, make_result, offset,
+                                   max_results, start, batch_size, page):
+            yield batch
+        offset += page_size
+        if _last_page(offset, page_size, page):
+            return
+
+def clean_html(text):
+    if text:
+        text = text.replace('<p>', '').replace('</p>', '\n')
+        text = text.replace('<br>', '\n')
+        text = ' '.join(text.split())
+    return text
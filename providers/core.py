@@ -0,0 +1,83 @@
+import os
+from datetime import datetime
+from results import SearchResult
+from providers.common import (API_PAGE_SIZE, guarded, aguarded, collect, iter_pages, aiter_pages, aiter_empty,
+                              clean_html)
+
+CORE_URL = "https://api.core.ac.uk/v3/search/works"
+
+def _parse_core_page(response):
+    data = response.json()
+    return data.get('results', []), data.get('totalHits')
+
+def _core_result(item, query, location):
+    # Get authors
+    authors = item.get('authors', [])
+    author_names = [author.get('name', 'Unknown Author') for author in authors]
+
+    # Get abstract
+    abstract = clean_html(item.get('abstract', ''))
+
+    # Get DOI and links
+    doi = item.get('doi', '')
+    link = f"https://doi.org/{doi}" if doi else item.get('downloadUrl', '')
+
+    # Get journal/publisher info
+    publisher = item.get('publisher', 'Unknown Publisher')
+    journal = item.get('journal', {}).get('name', '')
+    venue = journal or publisher
+
+    return SearchResult(
+        "CORE",
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        link,
+        item.get('title', 'Untitled'),
+        abstract,
+        authors=author_names,
+        year=item.get('yearPublished'),
+        doi=doi,
+        venue=venue
+    )
+
+def _core_pages(pages, query, max_results, start):
+    # pages is iter_pages or aiter_pages
+    headers = {
+        "Authorization": f"Bearer {os.getenv('CORE_API_KEY')}",
+        "Content-Type": "application/json"
+    }
+
+    def request_page(offset, size):
+        search_query = {
+            "q": query,
+            "limit": size,
+            "offset": offset,
+            "sort": "relevance"
+        }
+        return "POST", CORE_URL, {"json": search_query, "headers": headers}
+
+    tips = {401: "Your API key might be invalid."}
+    return pages("CORE", query, max_results, API_PAGE_SIZE, request_page, _parse_core_page, _core_result, tips,
+                 start=start, any_offset=True)
+
+def _has_core_key():
+    if os.getenv("CORE_API_KEY"):
+        return True
+    print("❌ CORE API key is missing. Please check your .env file.")
+    return False
+
+def iter_core(query, max_results, start=0):
+    print("🔬 Searching CORE...")
+    if not _has_core_key():
+        return iter(())
+    return guarded("CORE", _core_pages(iter_pages, query, max_results, start))
+
+def aiter_core(query, max_results, start=0):
+    print("🔬 Searching CORE...")
+    if not _has_core_key():
+        return aiter_empty()
+    return aguarded("CORE", _core_pages(aiter_pages, query, max_results, start))
+
+def search_core(query, max_results):
+    return collect(iter_core(query, max_results))
@@ -0,0 +1,65 @@
+from datetime import datetime
+from results import SearchResult
+from providers.common import API_PAGE_SIZE, guarded, aguarded, collect, iter_pages, aiter_pages, clean_html
+
+DOAJ_URL = "https://doaj.org/api/v4/search/articles"
+
+def _parse_doaj_page(response):
+    data = response.json()
+    return data.get('results', []), data.get('total')
+
+def _doaj_result(item, query, location):
+    # Get metadata
+    bibjson = item.get('bibjson', {})
+
+    # Get authors
+    authors = bibjson.get('author', [])
+    author_names = [author.get('name', 'Unknown Author') for author in authors]
+
+    # Get abstract
+    abstract = clean_html(bibjson.get('abstract', ''))
+
+    # Get DOI and link; the first identifier is often an ISSN, so only
+    # the one typed as a DOI counts, and without one the article link is used
+    doi = next((identifier.get('id', '') for identifier in bibjson.get('identifier', [])
+                if identifier.get('type', '').lower() == 'doi'), '')
+    link = f"https://doi.org/{doi}" if doi else (bibjson.get('link') or [{}])[0].get('url', '')
+
+    return SearchResult(
+        "DOAJ",
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        link,
+        bibjson.get('title', 'Untitled'),
+        abstract,
+        authors=author_names,
+        year=bibjson.get('year'),
+        doi=doi,
+        venue=bibjson.get('journal', {}).get('title', '')
+    )
+
+def _doaj_pages(pages, query, max_results, start):
+    # pages is iter_pages or aiter_pages
+    def request_page(offset, size):
+        params = {
+            'q': query,
+            'page': offset // size + 1,
+            'pageSize': size,
+            'sort': 'publishedDate:desc'
+        }
+        return "GET", DOAJ_URL, {"params": params}
+
+    return pages("DOAJ", query, max_results, API_PAGE_SIZE, request_page, _parse_doaj_page, _doaj_result,
+                 start=start)
+
+def iter_doaj(query, max_results, start=0):
+    print("📚 Searching Directory of Open Access Journals...")
+    return guarded("DOAJ", _doaj_pages(iter_pages, query, max_results, start))
+
+def aiter_doaj(query, max_results, start=0):
+    print("📚 Searching Directory of Open Access Journals...")
+    return aguarded("DOAJ", _doaj_pages(aiter_pages, query, max_results, start))
+
+def search_doaj(query, max_results):
+    return collect(iter_doaj(query, max_results))
@@ -0,0 +1,43 @@
+from datetime import datetime
+from duckduckgo_search import DDGS
+from location import get_location
+from results import SearchResult
+from providers.common import STREAM_BATCH_SIZE, logger, guarded, collect
+
+def _iter_duckduckgo(query, max_results):
+    location = get_location()
+    logger.debug("DuckDuckGo query: %s", query)
+
+    batch = []
+    with DDGS() as ddgs:
+        for i, r in enumerate(ddgs.text(query, max_results=max_results), 1):
+            try:
+                logger.debug("DuckDuckGo result %d/%d: %s <%s>", i, max_results, r.get("title"), r.get("href"))
+                batch.append(SearchResult(
+                    "DuckDuckGo",
+                    datetime.utcnow().isoformat(),
+                    location,
+                    query,
+                    r.get("href", ""),
+                    r.get("title", ""),
+                    r.get("body", "")
+                ))
+
+            except Exception as e:
+                print(f"⚠️ Error processing DuckDuckGo result: {e}")
+                continue
+
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+def iter_duckduckgo(query, max_results):
+    print("🦆 Searching DuckDuckGo...")
+    return guarded("DuckDuckGo", _iter_duckduckgo(query, max_results),
+                   "Check your internet connection or try again later.")
+
+def search_duckduckgo(query, max_results):
+    return collect(iter_duckduckgo(query, max_results))
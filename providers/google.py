@@ -0,0 +1,191 @@
+import os
+import time
+import asyncio
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from location import get_location
+import response_cache
+from results import SearchResult
+import metrics
+from providers.common import logger, guarded, aguarded, aiter_empty, collect
+
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+# Google CSE pages fetched at once per provider
+CSE_PAGE_WORKERS = int(os.getenv("MSA_CSE_PAGE_WORKERS", 4))
+# Google CSE never serves more than 100 results per query
+CSE_MAX_RESULTS = 100
+
+def _cse_starts(max_results, skip):
+    # skip: results an earlier run already has; their pages are not requested
+    return [start for start in range(1, min(max_results, CSE_MAX_RESULTS) + 1, 10) if start + 9 > skip]
+
+def _cse_params(cse_query, start):
+    return {
+        "key": os.getenv("GOOGLE_API_KEY"),
+        "cx": os.getenv("GOOGLE_CSE_ID"),
+        "q": cse_query,
+        "start": start
+    }
+
+def _cse_page(engine, provider, query, location, response, start, skip):
+    # One CSE response -> (results, data), or (None, None) when the results end here
+    logger.debug("%s response status: %d", engine, response.status_code)
+    if response.status_code != 200:
+        print(f"❌ Error response: {response.text}")
+        if response.status_code == 403:
+            print("💡 Tip: Your API key might be invalid or the Custom Search API might not be enabled.")
+        elif response.status_code == 429:
+            print("💡 Tip: You might have exceeded your daily quota.")
+        return None, None
+
+    started = time.perf_counter()
+    data = response.json()
+
+    # Process results
+    items = data.get("items", [])
+    if not items:
+        logger.debug("%s: no more results", engine)
+        return None, None
+
+    batch = [SearchResult(
+        engine,
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        item["link"],
+        item["title"],
+        item.get("snippet", "")
+    ) for i, item in enumerate(items, start) if i > skip]
+    metrics.observe("parse_seconds", time.perf_counter() - started, provider=provider)
+    for i, result in enumerate(batch, max(start, skip + 1)):
+        logger.debug("%s result %d: %s <%s>", engine, i, result.title, result.link)
+    return batch, data
+
+def _more_starts(data, starts, max_results):
+    # Called on the first page: the rest of the pages there are results for
+    if "nextPage" not in data.get("queries", {}):
+        return []
+    total = int(data.get("searchInformation", {}).get("totalResults", max_results))
+    return [start for start in starts[1:] if start <= total]
+
+def _iter_cse_pages(engine, provider, query, cse_query, max_results, skip=0):
+    location = get_location()
+    starts = _cse_starts(max_results, skip)
+    if not starts:
+        return
+    stop = threading.Event()
+
+    def fetch_page(start):
+        # Pages queued behind an empty one are dropped before they cost quota
+        if stop.is_set():
+            return None
+        logger.debug("%s request (start=%d)", engine, start)
+        return response_cache.cached_request(provider, query, start, 10, "GET", CSE_URL,
+                                             params=_cse_params(cse_query, start))
+
+    # The first page tells us roughly how many results exist; the remaining
+    # pages are then requested concurrently, paced by the CSE token bucket in
+    # ratelimit.py, and consumed in order so results keep their ranking
+    with ThreadPoolExecutor(max_workers=min(CSE_PAGE_WORKERS, len(starts))) as executor:
+        futures = [executor.submit(fetch_page, starts[0])]
+        try:
+            index = 0
+            while index < len(futures):
+                response = futures[index].result()
+                if response is None:
+                    return
+                batch, data = _cse_page(engine, provider, query, location, response, starts[index], skip)
+                if batch is None:
+                    return
+                if index == 0:
+                    futures += [executor.submit(fetch_page, start) for start in _more_starts(data, starts, max_results)]
+                yield batch
+
+                if "nextPage" not in data.get("queries", {}):
+                    return
+                index += 1
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+async def _aiter_cse_pages(engine, provider, query, cse_query, max_results, skip=0):
+    # _iter_cse_pages() on the event loop: the pages are tasks instead of
+    # pool threads, at most CSE_PAGE_WORKERS of them requesting at once
+    location = get_location()
+    starts = _cse_starts(max_results, skip)
+    if not starts:
+        return
+    workers = asyncio.Semaphore(CSE_PAGE_WORKERS)
+
+    async def fetch_page(start):
+        async with workers:
+            logger.debug("%s request (start=%d)", engine, start)
+            return await response_cache.cached_request_async(provider, query, start, 10, "GET", CSE_URL,
+                                                             params=_cse_params(cse_query, start))
+
+    tasks = [asyncio.ensure_future(fetch_page(starts[0]))]
+    try:
+        index = 0
+        while index < len(tasks):
+            batch, data = _cse_page(engine, provider, query, location, await tasks[index], starts[index], skip)
+            if batch is None:
+                return
+            if index == 0:
+                tasks += [asyncio.ensure_future(fetch_page(start)) for start in _more_starts(data, starts, max_results)]
+            yield batch
+
+            if "nextPage" not in data.get("queries", {}):
+                return
+            index += 1
+    finally:
+        # Pages still waiting for a worker are dropped before they cost quota
+        for task in tasks:
+            task.cancel()
+
+def iter_google(query, max_results, start=0):
+    print("🔍 Searching Google...")
+
+    if not os.getenv("GOOGLE_API_KEY") or not os.getenv("GOOGLE_CSE_ID"):
+        print("❌ Google API credentials are missing. Please check your .env file.")
+        return iter(())
+
+    return guarded("Google", _iter_cse_pages("Google", "google", query, query, max_results, start))
+
+def aiter_google(query, max_results, start=0):
+    print("🔍 Searching Google...")
+
+    if not os.getenv("GOOGLE_API_KEY") or not os.getenv("GOOGLE_CSE_ID"):
+        print("❌ Google API credentials are missing. Please check your .env file.")
+        return aiter_empty()
+
+    return aguarded("Google", _aiter_cse_pages("Google", "google", query, query, max_results, start))
+
+def search_google(query, max_results):
+    return collect(iter_google(query, max_results))
+
+def iter_researchgate(query, max_results, start=0):
+    print("📚 Searching ResearchGate via Google...")
+
+    if not os.getenv("GOOGLE_API_KEY") or not os.getenv("GOOGLE_CSE_ID"):
+        print("❌ Google API credentials are missing. Please check your .env file.")
+        return iter(())
+
+    cse_query = f"{query} site:researchgate.net filetype:pdf"
+    return guarded("ResearchGate", _iter_cse_pages("ResearchGate", "researchgate", query, cse_query, max_results,
+                                                   start))
+
+def aiter_researchgate(query, max_results, start=0):
+    print("📚 Searching ResearchGate via Google...")
+
+    if not os.getenv("GOOGLE_API_KEY") or not os.getenv("GOOGLE_CSE_ID"):
+        print("❌ Google API credentials are missing. Please check your .env file.")
+        return aiter_empty()
+
+    cse_query = f"{query} site:researchgate.net filetype:pdf"
+    return aguarded("ResearchGate", _aiter_cse_pages("ResearchGate", "researchgate", query, cse_query, max_results,
+                                                     start))
+
+def search_researchgate(query, max_results):
+    return collect(iter_researchgate(query, max_results))
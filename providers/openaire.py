@@ -0,0 +1,88 @@
+from datetime import datetime
+from results import SearchResult
+from providers.common import API_PAGE_SIZE, guarded, aguarded, collect, iter_pages, aiter_pages, clean_html
+
+OPENAIRE_URL = "https://api.openaire.eu/search/publications"
+
+def _parse_openaire_page(response):
+    data = response.json().get('response', {})
+    hits = data.get('results') or []
+    if isinstance(hits, dict):
+        hits = hits.get('result', [])
+    total = data.get('header', {}).get('total', {})
+    total = total.get('$') if isinstance(total, dict) else total
+    return hits, int(total) if total is not None else None
+
+def _openaire_result(item, query, location):
+    # Get metadata
+    metadata = item.get('metadata', {})
+    oaf = metadata.get('oaf:entity', {})
+
+    # Get authors
+    authors = oaf.get('author', [])
+    author_names = []
+    for author in authors:
+        name = author.get('foaf:name', '')
+        if name:
+            author_names.append(name)
+
+    # Get abstract
+    abstract = clean_html(oaf.get('description', ''))
+
+    # Get DOI and links
+    doi = oaf.get('pid', [{}])[0].get('$', '')
+    link = f"https://doi.org/{doi}" if doi else ''
+
+    # Get journal/publisher info
+    journal = oaf.get('journal', {})
+    journal_title = journal.get('title', '')
+    publisher = oaf.get('publisher', '')
+    venue = journal_title or publisher
+
+    # Get the acceptance date, for the year
+    accepted = oaf.get('dateofacceptance', '')
+    accepted = accepted.get('$', '') if isinstance(accepted, dict) else accepted
+
+    # Get title
+    title = oaf.get('title', 'Untitled')
+
+    return SearchResult(
+        "OpenAIRE",
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        link,
+        title,
+        abstract,
+        authors=author_names,
+        year=accepted,
+        doi=doi,
+        venue=venue
+    )
+
+def _openaire_pages(pages, query, max_results, start):
+    # pages is iter_pages or aiter_pages
+    def request_page(offset, size):
+        params = {
+            'keywords': query,
+            'page': offset // size + 1,
+            'size': size,
+            'format': 'json',
+            'OA': 'true',  # Only open access publications
+            'sortBy': 'dateofacceptance,descending'
+        }
+        return "GET", OPENAIRE_URL, {"params": params}
+
+    return pages("OpenAIRE", query, max_results, API_PAGE_SIZE, request_page, _parse_openaire_page,
+                 _openaire_result, start=start)
+
+def iter_openaire(query, max_results, start=0):
+    print("🔍 Searching OpenAIRE...")
+    return guarded("OpenAIRE", _openaire_pages(iter_pages, query, max_results, start))
+
+def aiter_openaire(query, max_results, start=0):
+    print("🔍 Searching OpenAIRE...")
+    return aguarded("OpenAIRE", _openaire_pages(aiter_pages, query, max_results, start))
+
+def search_openaire(query, max_results):
+    return collect(iter_openaire(query, max_results))
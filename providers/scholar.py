@@ -0,0 +1,78 @@
+import re
+from datetime import datetime
+from scholarly import scholarly
+from location import get_location
+from results import SearchResult
+from providers.common import STREAM_BATCH_SIZE, logger, guarded, collect
+
+# The cluster ID inside a result's citation link, e.g. "info:K8ZpoI6hZNoJ:"
+SCHOLAR_ID_PATTERN = re.compile(r"info:([^:&]+):")
+
+def scholar_id(pub):
+    match = SCHOLAR_ID_PATTERN.search(pub.get("url_scholarbib", ""))
+    return match.group(1) if match else ""
+
+def _iter_google_scholar(query, max_results):
+    location = get_location()
+    logger.debug("Google Scholar query: %s", query)
+    search_query = scholarly.search_pubs(query)
+
+    batch = []
+    for i in range(max_results):
+        try:
+            pub = next(search_query)
+
+            # Extract authors from the bib dictionary
+            authors = pub.get("bib", {}).get("author", [])
+
+            # Get the abstract, ensuring it's not too long
+            abstract = pub.get("bib", {}).get("abstract", "")
+            if len(abstract) > 1000:  # Truncate long abstracts
+                abstract = abstract[:997] + "..."
+
+            # Get the publication year
+            year = pub.get("bib", {}).get("pub_year", "")
+
+            # Get the venue
+            venue = pub.get("bib", {}).get("venue", "")
+
+            logger.debug("Google Scholar result %d/%d: %s <%s>", i + 1, max_results,
+                         pub.get("bib", {}).get("title"), pub.get("pub_url"))
+
+            batch.append(SearchResult(
+                "Google Scholar",
+                datetime.utcnow().isoformat(),
+                location,
+                query,
+                pub.get("pub_url", ""),
+                pub.get("bib", {}).get("title", "Untitled"),
+                abstract,
+                authors=authors,
+                year=year,
+                venue="" if venue == "NA" else venue,
+                citations=pub.get("num_citations", 0),
+                source_id=scholar_id(pub)
+            ))
+
+        except StopIteration:
+            logger.debug("Google Scholar: no more results")
+            break
+        except Exception as e:
+            print(f"⚠️ Error processing Scholar result: {e}")
+            print("💡 Tip: This might be due to rate limiting or temporary access issues")
+            continue
+
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+def iter_google_scholar(query, max_results):
+    print("🎓 Searching Google Scholar...")
+    return guarded("Google Scholar", _iter_google_scholar(query, max_results),
+                   "Google Scholar may be blocking requests. Try again later or use a different search engine.")
+
+def search_google_scholar(query, max_results):
+    return collect(iter_google_scholar(query, max_results))
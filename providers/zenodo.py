@@ -0,0 +1,70 @@
+from datetime import datetime
+from results import SearchResult
+from providers.common import (API_PAGE_SIZE, logger, guarded, aguarded, collect, iter_pages, aiter_pages,
+                              clean_html)
+
+ZENODO_URL = "https://zenodo.org/api/records"
+
+def _parse_zenodo_page(response):
+    hits = response.json().get('hits', {})
+    total = hits.get('total')
+    if isinstance(total, dict):
+        total = total.get('value')
+    return hits.get('hits', []), total
+
+def _zenodo_result(item, query, location):
+    # Get metadata
+    metadata = item.get('metadata', {})
+
+    # Get creators
+    creators = metadata.get('creators', [])
+    creator_names = [creator.get('name', 'Unknown Author') for creator in creators]
+
+    # Get description and clean HTML tags
+    description = clean_html(metadata.get('description', ''))
+
+    # Get DOI if available
+    doi = metadata.get('doi', '')
+    link = f"https://doi.org/{doi}" if doi else item.get('links', {}).get('html', '')
+
+    return SearchResult(
+        "Zenodo",
+        datetime.utcnow().isoformat(),
+        location,
+        query,
+        link,
+        metadata.get('title', 'Untitled'),
+        description,
+        authors=creator_names,
+        year=metadata.get('publication_date'),
+        doi=doi,
+        source_id=item.get('id', '')
+    )
+
+def _zenodo_pages(pages, query, max_results, start):
+    # pages is iter_pages or aiter_pages
+    def request_page(offset, size):
+        params = {
+            'q': query,
+            'size': size,
+            'page': offset // size + 1,
+            'sort': 'mostrecent',
+            'type': 'publication'
+        }
+        return "GET", ZENODO_URL, {"params": params}
+
+    return pages("Zenodo", query, max_results, API_PAGE_SIZE, request_page, _parse_zenodo_page, _zenodo_result,
+                 start=start)
+
+def iter_zenodo(query, max_results, start=0):
+    print("🔬 Searching Zenodo...")
+    logger.debug("Zenodo query: %s", query)
+    return guarded("Zenodo", _zenodo_pages(iter_pages, query, max_results, start))
+
+def aiter_zenodo(query, max_results, start=0):
+    print("🔬 Searching Zenodo...")
+    logger.debug("Zenodo query: %s", query)
+    return aguarded("Zenodo", _zenodo_pages(aiter_pages, query, max_results, start))
+
+def search_zenodo(query, max_results):
+    return collect(iter_zenodo(query, max_results))
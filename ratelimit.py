@@ -0,0 +1,168 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+# Name, requests per minute and burst size per host; MSA_RATE_LIMIT_<NAME>
+# overrides the per-minute rate. Custom Search allows 100 queries per minute,
+# arXiv asks for no more than one request every three seconds, Zenodo allows
+# 60 guest requests per minute and DOAJ two per second.
+HOST_LIMITS = {
+    "www.googleapis.com": ("CSE", 100, 10),
+    "export.arxiv.org": ("ARXIV", 20, 1),
+    "zenodo.org": ("ZENODO", 60, 5),
+    "api.core.ac.uk": ("CORE", 60, 5),
+    "doaj.org": ("DOAJ", 120, 5),
+    "api.openaire.eu": ("OPENAIRE", 60, 5)
+}
+
+# Hosts without a known limit start at this rate once they answer 429
+UNKNOWN_HOST_LIMIT = ("DEFAULT", 60, 5)
+
+# Responses worth retrying, and how long to back off between attempts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BACKOFF_BASE = 1.0
+
+# After a 429 the rate is halved (never below MIN_RATE_FRACTION of the
+# configured one) and then grows back by RECOVERY_FRACTION per success,
+# so a bucket settles just under what the API actually tolerates
+MIN_RATE_FRACTION = 0.05
+RECOVERY_FRACTION = 0.1
+
+def max_retries():
+    return int(os.getenv("MSA_MAX_RETRIES", 4))
+
+def _max_backoff():
+    return float(os.getenv("MSA_MAX_BACKOFF", 60))
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate  # tokens per second
+        self.max_rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self):
+        # Takes a token and returns 0, or returns the seconds to wait for one
+        with self.lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def throttle(self, pause):
+        # A 429: every caller of this host waits out the pause, and the rate
+        # is cut multiplicatively so the retries don't trigger it again
+        with self.lock:
+            self._refill()
+            self.throttled += 1
+            self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_FRACTION)
+            self.tokens = min(self.tokens, 0)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+    def recover(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+def _new_bucket(limit):
+    name, per_minute, burst = limit
+    per_minute = float(os.getenv(f"MSA_RATE_LIMIT_{name}", per_minute))
+    return TokenBucket(per_minute / 60, burst)
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(host, create=False):
+    # create=True gives hosts without a known limit an adaptive bucket too
+    with _buckets_lock:
+        if _buckets.get(host) is None:
+            limit = HOST_LIMITS.get(host)
+            if limit:
+                _buckets[host] = _new_bucket(limit)
+            elif create:
+                _buckets[host] = _new_bucket(UNKNOWN_HOST_LIMIT)
+            else:
+                _buckets[host] = None
+        return _buckets[host]
+
+def acquire(host):
+    bucket = get_bucket(host)
+    if bucket:
+        bucket.acquire()
+
+async def acquire_async(host):
+    bucket = get_bucket(host)
+    if bucket:
+        await bucket.acquire_async()
+
+def retry_after(response):
+    # Retry-After is either a number of seconds or an HTTP date
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff(attempt, response=None):
+    # Seconds to wait before retry number attempt (0-based): the server's
+    # Retry-After when given, otherwise exponential backoff with full jitter
+    delay = retry_after(response)
+    if delay is None:
+        delay = random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+    return min(delay, _max_backoff())
+
+def should_retry(response, attempt):
+    return attempt < max_retries() and response.status_code in RETRY_STATUSES
+
+def record_response(host, response, pause=0.0):
+    if response.status_code == 429:
+        get_bucket(host, create=True).throttle(pause)
+    elif response.status_code < 400:
+        bucket = get_bucket(host)
+        if bucket:
+            bucket.recover()
+
+def get_rate_stats():
+    with _buckets_lock:
+        return {
+            host: {"rate_per_minute": bucket.rate * 60, "max_per_minute": bucket.max_rate * 60,
+                   "throttled": bucket.throttled}
+            for host, bucket in _buckets.items() if bucket
+        }
@@ -0,0 +1,337 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+import http_client
+import metrics
+
+DEFAULT_TTL = 24 * 3600
+# Seconds a cached page stays fresh, per provider (override with MSA_CACHE_TTL_<PROVIDER>)
+PROVIDER_TTLS = {
+    "google": 7 * 24 * 3600,
+    "researchgate": 7 * 24 * 3600,
+    "zenodo": DEFAULT_TTL,
+    "core": 7 * 24 * 3600,
+    "arxiv": DEFAULT_TTL,
+    "doaj": DEFAULT_TTL,
+    "openaire": DEFAULT_TTL
+}
+
+_lock = threading.Lock()
+_conn = None
+_enabled = True
+_refresh = False
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "coalesced": 0}
+
+# Seconds a request waits for an identical one already in flight before
+# sending its own (only reached when the first caller never reads its body)
+FLIGHT_WAIT = 120
+
+_flights_lock = threading.Lock()
+_flights = {}
+# The same for async requests: futures on the shared event loop
+_async_flights = {}
+
+class CachedResponse:
+    from_cache = True
+
+    def __init__(self, status_code, content, encoding):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        # Parsed once, even when coalesced callers share this response
+        if not hasattr(self, "_json"):
+            self._json = json.loads(self.text)
+        return self._json
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+class _StoringResponse:
+    # Wraps a streamed response: the body is handed to the caller chunk by
+    # chunk and only stored once it has been read to the end
+    def __init__(self, response, on_complete, on_close=None):
+        self._response = response
+        self._on_complete = on_complete
+        self._on_close = on_close
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def iter_content(self, chunk_size=1):
+        chunks = []
+        try:
+            for chunk in self._response.iter_content(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            self._on_complete(b"".join(chunks))
+        finally:
+            self.close()
+
+    def close(self):
+        self._response.close()
+        if self._on_close:
+            self._on_close()
+
+def _received(provider, query, page, max_results, response, content):
+    metrics.count("response_bytes", len(content), provider=provider)
+    if _enabled and response.status_code == 200:
+        store(provider, query, page, max_results, response, content)
+
+def set_cache_mode(enabled=True, refresh=False):
+    # enabled=False skips the cache entirely, refresh=True only skips reads
+    global _enabled, _refresh
+    _enabled = enabled
+    _refresh = refresh
+
+def get_cache_mode():
+    return _enabled, _refresh
+
+def normalize_query(query):
+    # Only whitespace is collapsed: case matters to the providers' query
+    # syntax (arXiv and Elasticsearch AND/OR/NOT, Google's OR)
+    return " ".join(query.split())
+
+def ttl(provider):
+    return float(os.getenv(f"MSA_CACHE_TTL_{provider.upper()}",
+                           os.getenv("MSA_CACHE_TTL", PROVIDER_TTLS.get(provider, DEFAULT_TTL))))
+
+def _max_bytes():
+    return int(float(os.getenv("MSA_CACHE_MAX_MB", 200)) * 1024 * 1024)
+
+def _connect():
+    global _conn
+    if _conn is None:
+        path = Path(os.getenv("MSA_CACHE_PATH", "cache/responses.sqlite"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(path), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                max_results INTEGER NOT NULL,
+                status_code INTEGER NOT NULL,
+                encoding TEXT,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (provider, query, page, max_results)
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+    return _conn
+
+def get_cached(provider, query, page, max_results):
+    key = (provider, normalize_query(query), page, max_results)
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT status_code, encoding, content, stored_at FROM responses "
+            "WHERE provider = ? AND query = ? AND page = ? AND max_results = ?", key
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+        if time.time() - row[3] > ttl(provider):
+            conn.execute("DELETE FROM responses WHERE provider = ? AND query = ? AND page = ? AND max_results = ?", key)
+            conn.commit()
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        conn.execute("UPDATE responses SET last_access = ? "
+                     "WHERE provider = ? AND query = ? AND page = ? AND max_results = ?", (time.time(),) + key)
+        conn.commit()
+        return CachedResponse(row[0], row[2], row[1])
+
+def store(provider, query, page, max_results, response, content=None):
+    content = response.content if content is None else content
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (provider, normalize_query(query), page, max_results, response.status_code,
+             response.encoding, content, len(content), now, now)
+        )
+        _stats["stores"] += 1
+        _evict(conn)
+        conn.commit()
+
+def _evict(conn):
+    # Drop the least recently used pages until the store fits its size budget
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    excess = total - _max_bytes()
+    if excess <= 0:
+        return
+    for rowid, size in conn.execute("SELECT rowid, size FROM responses ORDER BY last_access").fetchall():
+        conn.execute("DELETE FROM responses WHERE rowid = ?", (rowid,))
+        _stats["evictions"] += 1
+        excess -= size
+        if excess <= 0:
+            break
+
+class _Flight:
+    # One request on the wire; identical requests wait for its response
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+def _flight_key(method, url, kwargs):
+    # (endpoint, params): Google and ResearchGate share the CSE endpoint, and
+    # batch jobs or service callers often ask for the very same page
+    return (method.upper(), url, json.dumps(kwargs.get("params"), sort_keys=True, default=str),
+            json.dumps(kwargs.get("json"), sort_keys=True, default=str), repr(kwargs.get("data")))
+
+def _land(key, flight, response=None, error=None):
+    with _flights_lock:
+        if flight.done.is_set():
+            return
+        flight.response = response
+        flight.error = error
+        if _flights.get(key) is flight:
+            del _flights[key]
+        flight.done.set()
+
+def _fetch(provider, query, page, max_results, method, url, stream, kwargs, key=None, flight=None):
+    metrics.count("cache_misses", provider=provider)
+    try:
+        with metrics.timer("request_seconds", provider=provider):
+            response = http_client.request(method, url, stream=stream, **kwargs)
+    except Exception as e:
+        if flight:
+            _land(key, flight, error=e)
+        raise
+
+    def shared(content):
+        return CachedResponse(response.status_code, content, response.encoding)
+
+    # A streamed body is counted, stored and shared once it has been read;
+    # closing it unread lets the waiting callers send their own request
+    if stream:
+        def on_complete(content):
+            _received(provider, query, page, max_results, response, content)
+            if flight:
+                _land(key, flight, shared(content))
+        on_close = (lambda: _land(key, flight)) if flight else None
+        return _StoringResponse(response, on_complete, on_close)
+
+    try:
+        _received(provider, query, page, max_results, response, response.content)
+        if flight is None:
+            return response
+        response = shared(response.content)
+        response.from_cache = False
+        _land(key, flight, response)
+        return response
+    finally:
+        # If storing the response failed, the waiting callers send their own request
+        if flight:
+            _land(key, flight)
+
+def cached_request(provider, query, page, max_results, method, url, stream=False, **kwargs):
+    # stream=True returns before the body is downloaded; read it with
+    # iter_content(), cached pages are replayed the same way
+    cached = _cached(provider, query, page, max_results)
+    if cached is not None:
+        return cached
+
+    # Single flight: concurrent identical requests share one network call
+    # and one parsed response
+    key = _flight_key(method, url, kwargs)
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if leader:
+        return _fetch(provider, query, page, max_results, method, url, stream, kwargs, key, flight)
+
+    _shared_count(provider)
+    if flight.done.wait(FLIGHT_WAIT):
+        if flight.error is not None:
+            raise flight.error
+        if flight.response is not None:
+            return flight.response
+    return _fetch(provider, query, page, max_results, method, url, stream, kwargs)
+
+def _cached(provider, query, page, max_results):
+    if _enabled and not _refresh:
+        cached = get_cached(provider, query, page, max_results)
+        if cached is not None:
+            metrics.count("cache_hits", provider=provider)
+            return cached
+    return None
+
+def _shared_count(provider):
+    metrics.count("coalesced", provider=provider)
+    with _lock:
+        _stats["coalesced"] += 1
+
+async def _fetch_async(provider, query, page, max_results, method, url, kwargs):
+    metrics.count("cache_misses", provider=provider)
+    with metrics.timer("request_seconds", provider=provider):
+        response = await http_client.request_async(method, url, **kwargs)
+    _received(provider, query, page, max_results, response, response.content)
+    response = CachedResponse(response.status_code, response.content, response.encoding)
+    response.from_cache = False
+    return response
+
+async def cached_request_async(provider, query, page, max_results, method, url, **kwargs):
+    # cached_request() for the async providers; the body is always read in
+    # full and the response is a CachedResponse (from_cache=False when fetched)
+    cached = _cached(provider, query, page, max_results)
+    if cached is not None:
+        return cached
+
+    key = _flight_key(method, url, kwargs)
+    flight = _async_flights.get(key)
+    if flight is not None:
+        _shared_count(provider)
+        response = await asyncio.shield(flight)
+        if response is not None:
+            return response
+        # The leader was cancelled before its response arrived
+        return await _fetch_async(provider, query, page, max_results, method, url, kwargs)
+    flight = _async_flights[key] = asyncio.get_running_loop().create_future()
+    try:
+        response = await _fetch_async(provider, query, page, max_results, method, url, kwargs)
+        flight.set_result(response)
+        return response
+    except BaseException as e:
+        # A cancelled leader releases the callers waiting on it, which then
+        # send their own request, as in cached_request()
+        if isinstance(e, asyncio.CancelledError):
+            flight.set_result(None)
+        else:
+            flight.set_exception(e)
+            flight.exception()  # marks it retrieved when nobody else was waiting
+        raise
+    finally:
+        del _async_flights[key]
+
+def get_cache_stats():
+    return dict(_stats)
+
+def print_cache_stats():
+    if _stats["hits"] or _stats["misses"]:
+        line = f"💾 Response cache: {_stats['hits']} hits, {_stats['misses']} misses"
+        if _stats["coalesced"]:
+            line += f", {_stats['coalesced']} shared with an identical request in flight"
+        print(line)
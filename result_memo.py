@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import sqlite3
+import threading
+from pathlib import Path
+import metrics
+import response_cache
+from results import RESULT_FIELDS, SearchResult
+
+# Results already fetched, per (normalized query, provider), in the order
+# the provider returned them. A run asking for no more results than are
+# stored is answered locally; a run asking for more gets the stored ones
+# and only fetches the rest, starting at the first missing result (for
+# providers that take start=N) instead of re-paging from the top. Rows
+# expire with the provider's response cache TTL and follow the same
+# --no-cache/--refresh switches. Runs of the same normalized query take
+# turns, so one run's fetch never interleaves with another's.
+
+# Stored results handed to the writer at a time
+MEMO_BATCH_SIZE = 100
+
+_FIELD_NAMES = [name for _, name in RESULT_FIELDS]
+
+# Seconds between tries for a query's turn on the event loop
+TURN_POLL = 0.05
+
+_lock = threading.Lock()
+_conn = None
+# Per (provider, normalized query): [lock held by the run whose turn it is, runs using it]
+_turns = {}
+
+def _connect():
+    global _conn
+    if _conn is None:
+        path = Path(os.getenv("MSA_MEMO_PATH", "cache/results.sqlite"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(path), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS memo (
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                fetched INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (provider, query)
+            ) WITHOUT ROWID
+        """)
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS memo_rows (
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (provider, query, position)
+            ) WITHOUT ROWID
+        """)
+    return _conn
+
+def _dump(record):
+    return json.dumps([getattr(record, name) for name in _FIELD_NAMES])
+
+def _load(result, query):
+    # Stored rows answer the query as it is typed now
+    fields = dict(zip(_FIELD_NAMES, json.loads(result)))
+    fields["query"] = query
+    return SearchResult(**fields)
+
+def _forget(conn, key):
+    conn.execute("DELETE FROM memo WHERE provider = ? AND query = ?", key)
+    conn.execute("DELETE FROM memo_rows WHERE provider = ? AND query = ?", key)
+
+def _key(provider, query):
+    return provider, response_cache.normalize_query(query)
+
+def forget(provider, query):
+    with _lock:
+        conn = _connect()
+        _forget(conn, _key(provider, query))
+        conn.commit()
+
+def load(provider, query, max_results):
+    # Up to max_results stored results, or [] when there are none or they expired
+    key = _key(provider, query)
+    with _lock:
+        conn = _connect()
+        row = conn.execute("SELECT fetched, stored_at FROM memo WHERE provider = ? AND query = ?", key).fetchone()
+        if row is None:
+            return []
+        if time.time() - row[1] > response_cache.ttl(provider):
+            _forget(conn, key)
+            conn.commit()
+            return []
+        results = conn.execute("SELECT result FROM memo_rows WHERE provider = ? AND query = ? AND position < ? "
+                               "ORDER BY position", key + (min(max_results, row[0]),)).fetchall()
+    return [_load(result, query) for result, in results]
+
+def store(provider, query, position, records):
+    # records are the provider's results position, position + 1, ...
+    key = _key(provider, query)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.executemany("INSERT OR REPLACE INTO memo_rows VALUES (?, ?, ?, ?)",
+                         [key + (position + i, _dump(record)) for i, record in enumerate(records)])
+        # fetched counts the rows stored from position 0 without a gap
+        row = conn.execute("SELECT fetched FROM memo WHERE provider = ? AND query = ?", key).fetchone()
+        fetched = row[0] if row else 0
+        if position <= fetched:
+            fetched = max(fetched, position + len(records))
+            while conn.execute("SELECT 1 FROM memo_rows WHERE provider = ? AND query = ? AND position = ?",
+                               key + (fetched,)).fetchone():
+                fetched += 1
+        conn.execute("INSERT INTO memo VALUES (?, ?, ?, ?) ON CONFLICT (provider, query) "
+                     "DO UPDATE SET fetched = excluded.fetched", key + (fetched, now))
+        conn.commit()
+
+def _turn(provider, query):
+    # The lock for this query's turn; every _turn() is paired with a _done()
+    with _lock:
+        turn = _turns.setdefault(_key(provider, query), [threading.Lock(), 0])
+        turn[1] += 1
+    return turn[0]
+
+def _done(provider, query):
+    key = _key(provider, query)
+    with _lock:
+        _turns[key][1] -= 1
+        if not _turns[key][1]:
+            del _turns[key]
+
+def _resumable(search):
+    return "start" in inspect.signature(search).parameters
+
+def _fetch_plan(provider, query, max_results, search, stored):
+    # (batches, results to skip) for the results missing after stored.
+    # Providers without start=N search from the top; the results already
+    # yielded are skipped.
+    if stored:
+        print(f"♻️ {provider}: {len(stored)} results from earlier runs, fetching the rest")
+    if stored and _resumable(search):
+        return search(query, max_results, start=len(stored)), 0
+    return search(query, max_results), len(stored)
+
+def _stored(provider, query, max_results, refresh):
+    # (stored results, the same in batches); a refresh starts over
+    if refresh:
+        forget(provider, query)
+    stored = [] if refresh else load(provider, query, max_results)
+    if stored:
+        metrics.count("memo_rows", len(stored), provider=provider)
+    if stored and len(stored) >= max_results:
+        print(f"♻️ {provider}: all {len(stored)} results from earlier runs")
+    return stored, [stored[start:start + MEMO_BATCH_SIZE] for start in range(0, len(stored), MEMO_BATCH_SIZE)]
+
+def _keep(provider, query, batch, state):
+    # Drops what is still to be skipped and stores the rest; state is [position, skip]
+    if state[1]:
+        dropped = min(state[1], len(batch))
+        batch, state[1] = batch[dropped:], state[1] - dropped
+    if batch:
+        store(provider, query, state[0], batch)
+        state[0] += len(batch)
+    return batch
+
+def iter_results(provider, query, max_results, search):
+    # search(query, max_results[, start]) is the provider; yields result batches
+    enabled, refresh = response_cache.get_cache_mode()
+    if not enabled:
+        yield from search(query, max_results)
+        return
+
+    turn = _turn(provider, query)
+    try:
+        with turn:
+            stored, batches = _stored(provider, query, max_results, refresh)
+            yield from batches
+            if len(stored) >= max_results:
+                return
+            batches, skip = _fetch_plan(provider, query, max_results, search, stored)
+            state = [len(stored), skip]
+            for batch in batches:
+                batch = _keep(provider, query, batch, state)
+                if batch:
+                    yield batch
+    finally:
+        _done(provider, query)
+
+async def aiter_results(provider, query, max_results, search):
+    # iter_results() for an async provider (see providers.load_async_provider)
+    enabled, refresh = response_cache.get_cache_mode()
+    if not enabled:
+        async for batch in search(query, max_results):
+            yield batch
+        return
+
+    turn = _turn(provider, query)
+    try:
+        # Polled, so waiting never blocks the event loop
+        while not turn.acquire(blocking=False):
+            await asyncio.sleep(TURN_POLL)
+        try:
+            stored, batches = _stored(provider, query, max_results, refresh)
+            for batch in batches:
+                yield batch
+            if len(stored) >= max_results:
+                return
+            batches, skip = _fetch_plan(provider, query, max_results, search, stored)
+            state = [len(stored), skip]
+            async for batch in batches:
+                batch = _keep(provider, query, batch, state)
+                if batch:
+                    yield batch
+        finally:
+            turn.release()
+    finally:
+        _done(provider, query)
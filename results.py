@@ -0,0 +1,100 @@
+import sys
+
+# Output columns, in order, and the SearchResult attribute behind each one
+RESULT_FIELDS = [
+    ("Search Engine", "engine"),
+    ("Date of Search", "date"),
+    ("Location", "location"),
+    ("Search Query", "query"),
+    ("Result Link", "link"),
+    ("Result Title", "title"),
+    ("Result Description", "description"),
+    ("Authors", "authors"),
+    ("Year", "year"),
+    ("DOI", "doi"),
+    ("Venue", "venue"),
+    ("Citations", "citations"),
+    ("Category", "category"),
+    ("Source ID", "source_id")
+]
+RESULT_COLUMNS = [column for column, _ in RESULT_FIELDS]
+
+# Columns stored as integers; everything else is a string
+INTEGER_COLUMNS = ("Year", "Citations")
+
+# Authors are kept as a tuple and joined with this in output files
+AUTHOR_SEPARATOR = "; "
+
+def _year(value):
+    # 2024, "2024" or a date such as "2024-01-31" -> 2024
+    try:
+        return int(str(value).strip()[:4]) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+class SearchResult:
+    # One row per result; __slots__ keeps a record at a fraction of a
+    # dict's size, and the engine, location and query strings are interned
+    # so thousands of rows share a single copy of each
+    __slots__ = ("engine", "date", "location", "query", "link", "title", "description",
+                 "authors", "year", "doi", "venue", "citations", "category", "source_id")
+
+    def __init__(self, engine, date, location, query, link, title, description="",
+                 authors=(), year=None, doi="", venue="", citations=None, category="", source_id=""):
+        self.engine = sys.intern(engine)
+        self.date = date
+        self.location = sys.intern(location or "")
+        self.query = sys.intern(query)
+        self.link = link or ""
+        self.title = title or ""
+        self.description = description or ""
+        self.authors = tuple(author for author in authors if author)
+        self.year = _year(year)
+        self.doi = (doi or "").strip().lower()
+        self.venue = venue or ""
+        self.citations = None if citations is None else int(citations)
+        self.category = category or ""
+        # The provider's own ID for the result (Scholar cluster, arXiv or Zenodo record)
+        self.source_id = str(source_id or "")
+
+    def __repr__(self):
+        return f"SearchResult({self.engine!r}, {self.title!r}, {self.link!r})"
+
+    # Pickled as a plain tuple of values (records parsed in parse_pool's
+    # worker processes travel back this way), re-interned on arrival
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, sys.intern(value) if name in ("engine", "location", "query") else value)
+
+    def as_row(self):
+        return tuple(AUTHOR_SEPARATOR.join(self.authors) if name == "authors" else getattr(self, name)
+                     for _, name in RESULT_FIELDS)
+
+def to_columns(records):
+    # Column-wise conversion: one pass per field instead of one dict per row
+    columns = {}
+    for column, name in RESULT_FIELDS:
+        values = [getattr(record, name) for record in records]
+        if name == "authors":
+            values = [AUTHOR_SEPARATOR.join(authors) for authors in values]
+        columns[column] = values
+    return columns
+
+def to_frame(records):
+    import pandas as pd
+    return pd.DataFrame({column: pd.array(values, dtype="Int32" if column in INTEGER_COLUMNS else "string")
+                         for column, values in to_columns(records).items()})
+
+def arrow_schema(columns=RESULT_COLUMNS):
+    import pyarrow as pa
+    return pa.schema([(column, pa.int32() if column in INTEGER_COLUMNS else pa.string()) for column in columns])
+
+def to_arrow(records, schema=None):
+    import pyarrow as pa
+    schema = schema or arrow_schema()
+    columns = to_columns(records)
+    arrays = [pa.array(columns[field.name], field.type) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
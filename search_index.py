@@ -0,0 +1,235 @@
+import os
+import time
+import sqlite3
+from pathlib import Path
+from writers import READABLE_EXTENSIONS
+
+# A local full-text index (SQLite FTS5) over every harvested result, so the
+# corpus can be searched without reopening result files or calling an API.
+# perform_search and clean add what they write; files the index has not
+# seen yet (older results, files copied into output/) are picked up the
+# next time it is searched. Each result is indexed once, keyed by DOI, link
+# or title, and later writes fill in what earlier ones were missing.
+
+# Indexed columns first; the rest are stored for display only
+INDEX_FIELDS = ["title", "description", "authors", "engine", "venue", "link", "query", "year", "doi"]
+SEARCHABLE_FIELDS = ["title", "description", "authors", "engine"]
+
+# Where each field comes from in a search result file or a cleaned file
+FRAME_COLUMNS = {
+    "title": ("Result Title", "Title"),
+    "description": ("Result Description",),
+    "authors": ("Authors",),
+    "engine": ("Search Engine", "Search Platform"),
+    "venue": ("Venue",),
+    "link": ("Result Link", "Link"),
+    "query": ("Search Query",),
+    "year": ("Year",),
+    "doi": ("DOI",)
+}
+
+# Seconds a write waits for another process (a concurrent search or clean)
+# to finish its transaction before giving up
+BUSY_TIMEOUT = float(os.getenv("MSA_INDEX_BUSY_TIMEOUT", 30))
+
+# Folders whose result files belong to the corpus
+CORPUS_FOLDERS = ["output", "cleaned", os.path.join("cleaned", "cleaned_search_results")]
+
+def enabled():
+    return os.getenv("MSA_INDEX", "1") != "0"
+
+def _connect():
+    path = Path(os.getenv("MSA_INDEX_PATH", "cache/search_index.sqlite"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    columns = ", ".join(field if field in SEARCHABLE_FIELDS else f"{field} UNINDEXED" for field in INDEX_FIELDS)
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS results USING fts5({columns}, "
+                 "tokenize='unicode61 remove_diacritics 2')")
+    conn.execute("CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            name TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            indexed_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+def _key(row):
+    # The same paper found again (another query, another day) replaces its entry
+    title, link, doi = row[0], row[5], row[8]
+    if doi:
+        return f"doi:{doi.strip().lower()}"
+    if link:
+        return f"link:{link.strip().lower().rstrip('/')}"
+    if title:
+        return f"title:{' '.join(title.lower().split())}"
+    return None
+
+def _select(conn, sql, values):
+    # sql has one "{}" for an IN (...) list; values are queried 500 at a time
+    for start in range(0, len(values), 500):
+        chunk = values[start:start + 500]
+        yield from conn.execute(sql.format(",".join("?" * len(chunk))), chunk)
+
+def _upsert(conn, rows):
+    rows_by_key = {}
+    for row in rows:
+        key = _key(row)
+        if key:
+            previous = rows_by_key.get(key)
+            rows_by_key[key] = tuple(new or old for new, old in zip(row, previous)) if previous else row
+    keys = list(rows_by_key)
+    ids = dict(_select(conn, "SELECT key, id FROM docs WHERE key IN ({})", keys))
+    existing = {row[0]: row[1:] for row in _select(
+        conn, f"SELECT rowid, {', '.join(INDEX_FIELDS)} FROM results WHERE rowid IN ({{}})", list(ids.values()))}
+
+    new_keys = [key for key in keys if key not in ids]
+    conn.executemany("INSERT INTO docs (key) VALUES (?)", [(key,) for key in new_keys])
+    ids.update(_select(conn, "SELECT key, id FROM docs WHERE key IN ({})", new_keys))
+
+    # Empty fields keep what an earlier write stored (cleaned files have no description)
+    merged = []
+    for key, row in rows_by_key.items():
+        old = existing.get(ids[key])
+        merged.append((ids[key],) + (tuple(new or prev for new, prev in zip(row, old)) if old else row))
+    conn.executemany(f"INSERT OR REPLACE INTO results (rowid, {', '.join(INDEX_FIELDS)}) "
+                     f"VALUES ({', '.join('?' * (len(INDEX_FIELDS) + 1))})", merged)
+    return len(rows_by_key)
+
+def _text(value):
+    return "" if value is None else str(value)
+
+def _record_row(record):
+    return (record.title, record.description, "; ".join(record.authors), record.engine, record.venue,
+            record.link, record.query, record.year, record.doi)
+
+def _frame_rows(df):
+    columns = []
+    for field in INDEX_FIELDS:
+        column = next((name for name in FRAME_COLUMNS[field] if name in df), None)
+        if column:
+            values = df[column].astype(object).where(df[column].notna(), None).tolist()
+        else:
+            values = [None] * len(df)
+        if field == "year":
+            columns.append([int(value) if _text(value).strip().isdigit() else None for value in values])
+        else:
+            columns.append([_text(value) for value in values])
+    return list(zip(*columns))
+
+def _mark_file(conn, path):
+    stat = os.stat(path)
+    conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                 (os.path.normpath(path), stat.st_mtime, stat.st_size, time.time()))
+
+class IndexWriter:
+    # Indexes search results as they are written. Each batch is its own
+    # transaction, so concurrent searches only hold the write lock briefly.
+    def __init__(self):
+        self._conn = _connect()
+        self.rows = 0
+
+    def add_records(self, records):
+        try:
+            self.rows += _upsert(self._conn, [_record_row(record) for record in records])
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def close(self, filename=None):
+        # Without a filename (or after a failed batch) the file is left
+        # unmarked, so the next ./msa find indexes it in full
+        try:
+            if filename:
+                _mark_file(self._conn, filename)
+                self._conn.commit()
+        finally:
+            self._conn.close()
+
+def add_frame(df, filename=None):
+    # A results frame (a search result or cleaned file) -> the index
+    conn = _connect()
+    try:
+        count = _upsert(conn, _frame_rows(df))
+        if filename:
+            _mark_file(conn, filename)
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+def _corpus_files():
+    for folder in CORPUS_FOLDERS:
+        if os.path.isdir(folder):
+            for file in sorted(os.listdir(folder)):
+                if file.endswith(READABLE_EXTENSIONS):
+                    yield os.path.join(folder, file)
+
+def update(rebuild=False):
+    # Indexes the result files that are new or changed since they were indexed
+    from writers import read_results
+    conn = _connect()
+    try:
+        if rebuild:
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM docs")
+            conn.execute("DELETE FROM files")
+        known = {name: (mtime, size) for name, mtime, size in conn.execute("SELECT name, mtime, size FROM files")}
+        indexed = 0
+        for path in _corpus_files():
+            stat = os.stat(path)
+            if known.get(os.path.normpath(path)) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                _upsert(conn, _frame_rows(read_results(path)))
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠️ Could not index {path}: {e}")
+                continue
+            _mark_file(conn, path)
+            conn.commit()
+            indexed += 1
+        if indexed:
+            print(f"🗂️ Indexed {indexed} new result files")
+        return indexed
+    finally:
+        conn.close()
+
+def _match_expression(text):
+    # Plain words are matched as given; FTS5 syntax (AND/OR/NOT, "phrases",
+    # prefix*, title:word) is passed through when it parses
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+def find(text, limit=20, engine=None):
+    # Returns (rows, seconds); each row is a dict with a highlighted snippet
+    conn = _connect()
+    try:
+        sql = (f"SELECT {', '.join(INDEX_FIELDS)}, snippet(results, -1, '[', ']', '…', 16) FROM results "
+               "WHERE results MATCH ?" + (" AND engine = ? COLLATE NOCASE" if engine else "") +
+               " ORDER BY rank LIMIT ?")
+        started = time.perf_counter()
+        for expression in (text, _match_expression(text)):
+            params = [expression] + ([engine] if engine else []) + [limit]
+            try:
+                rows = conn.execute(sql, params).fetchall()
+                break
+            except sqlite3.OperationalError:
+                # Not valid FTS5 syntax (e.g. "covid-19"): search the words instead
+                continue
+        else:
+            rows = []
+        seconds = time.perf_counter() - started
+    finally:
+        conn.close()
+    return [dict(zip(INDEX_FIELDS + ["snippet"], row)) for row in rows], seconds
+
+def count():
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import metrics
+import response_cache
+import search_index
+from providers import PROVIDERS as SEARCH_PROVIDERS, MAX_RESULTS_LIMIT
+from results import RESULT_COLUMNS
+from search import stream_providers, save_stream
+from writers import OUTPUT_FORMATS
+
+# ./msa serve: search, clean and find over a local HTTP/JSON API. One
+# long-running process keeps the connection pools, the location, the
+# rate limiters and the caches warm for every caller, and identical
+# searches that arrive while one is running share its result.
+#
+#   GET  /health
+#   GET  /search?q=...&tools=zenodo,arxiv&max_results=100   (or POST a JSON body)
+#   POST /clean   {"incremental": true, "enrich": false, "format": "parquet"}
+#   GET  /find?q=...&limit=20&engine=arXiv
+#   GET  /metrics   (Prometheus text; /metrics.json for the JSON report)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Tools used when a search names none: the ones that need no API key
+DEFAULT_TOOLS = ["duckduckgo", "zenodo", "arxiv", "doaj", "openaire"]
+
+# Finished searches kept in memory, in front of the on-disk response cache and memo
+RESPONSE_CACHE_SIZE = int(os.getenv("MSA_SERVE_CACHE_SIZE", 128))
+RESPONSE_CACHE_TTL = float(os.getenv("MSA_SERVE_CACHE_TTL", 300))
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+class RequestError(Exception):
+    pass
+
+class _Call:
+    # One running search; callers with the same key wait for its result
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_calls_lock = threading.Lock()
+_calls = {}
+_recent = OrderedDict()
+_clean_lock = threading.Lock()
+
+def _coalesced(key, run):
+    with _calls_lock:
+        cached = _recent.get(key)
+        if cached and time.monotonic() - cached[0] < RESPONSE_CACHE_TTL:
+            _recent.move_to_end(key)
+            metrics.count("serve_memory_hits")
+            return cached[1]
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+    if not leader:
+        metrics.count("serve_coalesced")
+        call.done.wait()
+        if call.error:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = run()
+        with _calls_lock:
+            _recent[key] = (time.monotonic(), call.result)
+            while len(_recent) > RESPONSE_CACHE_SIZE:
+                _recent.popitem(last=False)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            del _calls[key]
+        call.done.set()
+
+def _tools(value):
+    if value is None:
+        return DEFAULT_TOOLS
+    tools = value.split(",") if isinstance(value, str) else list(value)
+    tools = [tool.strip() for tool in tools if tool.strip()]
+    unknown = [tool for tool in tools if tool not in SEARCH_PROVIDERS]
+    if not tools or unknown:
+        raise RequestError(f"tools: choose from {', '.join(SEARCH_PROVIDERS)}")
+    return tools
+
+def _number(params, name, default, cast=int, low=1, high=None):
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = cast(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"{name} must be a number")
+    if value < low or (high is not None and value > high):
+        raise RequestError(f"{name} must be between {low} and {high}" if high else f"{name} must be at least {low}")
+    return value
+
+def _flag(params, name, default=False):
+    value = params.get(name, default)
+    return value.lower() in ("1", "true", "yes") if isinstance(value, str) else bool(value)
+
+def search(params):
+    query = (params.get("q") or params.get("query") or "").strip()
+    if not query:
+        raise RequestError("q: a search query is required")
+    tools = _tools(params.get("tools"))
+    max_results = _number(params, "max_results", 10, high=MAX_RESULTS_LIMIT)
+    timeout = _number(params, "timeout", None, float, low=0)
+    deadline = _number(params, "deadline", None, float, low=0)
+    save = _flag(params, "save", True)
+    output_format = params.get("format") or None
+    if output_format and output_format not in OUTPUT_FORMATS:
+        raise RequestError(f"format: choose from {', '.join(OUTPUT_FORMATS)}")
+
+    def run():
+        started = time.perf_counter()
+        batches = list(stream_providers(query, max_results, tools, timeout, deadline))
+        filename = save_stream(iter(batches), urllib.parse.quote_plus(query), output_format) if save else None
+        results = [dict(zip(RESULT_COLUMNS, record.as_row())) for _, batch in batches for record in batch]
+        return {
+            "query": query,
+            "tools": tools,
+            "max_results": max_results,
+            "count": len(results),
+            "file": filename,
+            "seconds": round(time.perf_counter() - started, 3),
+            "results": results
+        }
+
+    key = ("search", response_cache.normalize_query(query), tuple(sorted(tools)), max_results, timeout,
+           deadline, save, output_format)
+    return _coalesced(key, run)
+
+def clean(params):
+    from clean import clean_and_format_results
+    output_format = params.get("format") or None
+    if output_format and output_format not in OUTPUT_FORMATS:
+        raise RequestError(f"format: choose from {', '.join(OUTPUT_FORMATS)}")
+    # Cleans read and write the same folders, so they run one at a time
+    with _clean_lock:
+        started = time.perf_counter()
+        filename = clean_and_format_results(output_format=output_format,
+                                            incremental=_flag(params, "incremental"),
+                                            rebuild=_flag(params, "rebuild"),
+                                            enrich=_flag(params, "enrich"))
+    return {"file": filename, "seconds": round(time.perf_counter() - started, 3)}
+
+def find(params):
+    text = (params.get("q") or "").strip()
+    if not text:
+        raise RequestError("q: search text is required")
+    search_index.update()
+    rows, seconds = search_index.find(text, _number(params, "limit", 20), params.get("engine") or None)
+    return {"q": text, "count": len(rows), "seconds": round(seconds, 6), "results": rows}
+
+def health(params):
+    return {"status": "ok", "providers": list(SEARCH_PROVIDERS)}
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/search"): search,
+    ("POST", "/search"): search,
+    ("POST", "/clean"): clean,
+    ("GET", "/find"): find
+}
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body.encode("utf-8") if isinstance(body, str) else json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _params(self):
+        parts = urllib.parse.urlsplit(self.path)
+        params = {key: values[-1] for key, values in urllib.parse.parse_qs(parts.query).items()}
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                raise RequestError("request body too large")
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise RequestError("the request body must be a JSON object")
+            params.update(body)
+        return parts.path.rstrip("/") or "/", params
+
+    def _handle(self):
+        try:
+            path, params = self._params()
+        except (RequestError, ValueError) as e:
+            return self._send(400, {"error": str(e)})
+        if path == "/metrics":
+            return self._send(200, metrics.prometheus_text(), "text/plain; version=0.0.4")
+        if path == "/metrics.json":
+            return self._send(200, metrics.report())
+        route = ROUTES.get((self.command, path))
+        if route is None:
+            return self._send(404, {"error": f"no route for {self.command} {path}"})
+        try:
+            with metrics.timer("serve_seconds", route=path):
+                return self._send(200, route(params))
+        except RequestError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            print(f"❌ {self.command} {path} failed: {e}")
+            return self._send(500, {"error": str(e)})
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+def serve(host=None, port=None):
+    host = host or os.getenv("MSA_SERVE_HOST", DEFAULT_HOST)
+    port = int(port or os.getenv("MSA_SERVE_PORT", DEFAULT_PORT))
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"🚀 Serving search, clean and find on http://{host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+import pytest
+
+# The modules live at the repository root, next to main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    # Each test gets its own response cache, result memo and search index
+    import response_cache
+    import result_memo
+    monkeypatch.setenv("MSA_CACHE_PATH", str(tmp_path / "responses.sqlite"))
+    monkeypatch.setenv("MSA_MEMO_PATH", str(tmp_path / "results.sqlite"))
+    monkeypatch.setenv("MSA_INDEX_PATH", str(tmp_path / "search_index.sqlite"))
+    monkeypatch.setattr(response_cache, "_conn", None)
+    monkeypatch.setattr(result_memo, "_conn", None)
@@ -0,0 +1,52 @@
+import csv
+import threading
+import providers
+import search
+from results import SearchResult
+
+calls = []
+
+def iter_fake(query, max_results):
+    calls.append(query)
+    yield [SearchResult("Fake", "2026-01-01", "Here", query, f"https://example.org/{query}", query)]
+
+def test_repeated_queries_run_once(tmp_path, monkeypatch):
+    calls.clear()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MSA_LOCATION", "Here")
+    monkeypatch.setitem(providers.PROVIDERS, "fake", f"{__name__}:iter_fake")
+
+    filename = search.perform_batch_search(["foo", "bar", "foo"], 10, ["fake"], output_format="csv")
+    with open(filename, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    assert sorted(calls) == ["bar", "foo"]
+    assert sorted(row["Search Query"] for row in rows) == ["bar", "foo"]
+
+def test_async_batch_ends_when_a_provider_cannot_be_imported(tmp_path, monkeypatch):
+    calls.clear()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MSA_LOCATION", "Here")
+    monkeypatch.setitem(providers.PROVIDERS, "fake", f"{__name__}:iter_fake")
+    monkeypatch.setitem(providers.PROVIDERS, "broken", "no_such_module:iter_x")
+    monkeypatch.setattr(search, "_async_mode", True)
+    received = []
+
+    def run():
+        jobs = [("foo", "broken"), ("foo", "fake")]
+        received.extend(search.stream_jobs(jobs, 10, deadline=float("inf")))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert [job for job, _ in received] == [("foo", "fake")]
+
+def test_searches_in_the_same_second_write_separate_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MSA_INDEX", "0")
+    first = search.save_stream(iter([(("soil", "zenodo"), list(iter_fake("soil", 10))[0])]), "soil", "csv")
+    second = search.save_stream(iter([(("soil", "doaj"), list(iter_fake("soil", 10))[0])]), "soil", "csv")
+    assert first != second
+    with open(first, newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 1
@@ -0,0 +1,21 @@
+import os
+import pytest
+import clean
+from results import SearchResult
+from writers import open_writer, read_results
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_titles_differing_only_in_suffix_are_kept(tmp_path, monkeypatch, incremental):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MSA_INDEX", "0")
+    os.makedirs("output")
+    writer = open_writer("output/20260101_000000_soil", "csv")
+    writer.write_records([SearchResult("Zenodo", "2026-01-01", "Here", "soil", f"https://zenodo.org/records/{n}",
+                                       f"Soil carbon in alpine meadows - Part {n}") for n in (1, 2)])
+    writer.close()
+
+    clean.clean_and_format_results(output_format="csv", incremental=incremental)
+    folder = clean.DATASET_FOLDER if incremental else clean.CLEANED_FOLDER
+    [cleaned] = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".csv")]
+    assert sorted(read_results(cleaned)["Title"]) == ["Soil carbon in alpine meadows - Part 1",
+                                                      "Soil carbon in alpine meadows - Part 2"]
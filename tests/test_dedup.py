@@ -0,0 +1,29 @@
+import pandas as pd
+from dedup import dedupe
+
+TITLE = "A longitudinal study of soil carbon storage in restored alpine meadow ecosystems"
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["Search Platform", "Title", "Link", "DOI"])
+
+def test_near_identical_titles_with_different_dois_are_kept():
+    df = _frame([
+        ("CORE", f"{TITLE}, part 1", "https://core.ac.uk/works/1", "10.1234/a"),
+        ("CORE", f"{TITLE}, part 2", "https://core.ac.uk/works/2", "10.1234/b"),
+    ])
+    assert list(dedupe(df)["DOI"]) == ["10.1234/a", "10.1234/b"]
+
+def test_row_without_doi_does_not_bridge_different_dois():
+    df = _frame([
+        ("CORE", f"{TITLE}, part 1", "https://core.ac.uk/works/1", "10.1234/a"),
+        ("Google", f"{TITLE}, part 1", "https://example.org/soil", ""),
+        ("CORE", f"{TITLE}, part 2", "https://core.ac.uk/works/2", "10.1234/b"),
+    ])
+    assert list(dedupe(df)["DOI"]) == ["10.1234/a", "10.1234/b"]
+
+def test_same_title_without_dois_still_merges():
+    df = _frame([
+        ("CORE", f"{TITLE}, part 1", "https://core.ac.uk/works/1", "10.1234/a"),
+        ("Google", f"{TITLE}, Part 1", "https://example.org/soil", ""),
+    ])
+    assert list(dedupe(df)["Link"]) == ["https://core.ac.uk/works/1"]
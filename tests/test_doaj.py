@@ -0,0 +1,21 @@
+from providers.doaj import _doaj_result
+
+def _item(n, identifiers):
+    return {"bibjson": {
+        "title": f"Article {n}",
+        "identifier": identifiers,
+        "link": [{"type": "fulltext", "url": f"https://journal.example.org/{n}"}],
+        "journal": {"title": "Sustainability"}
+    }}
+
+def test_link_uses_doi_when_issn_is_listed_first():
+    results = [_doaj_result(_item(n, [{"type": "pissn", "id": "1234-5678"},
+                                      {"type": "doi", "id": f"10.3390/su14{n}"}]), "q", "Here")
+               for n in range(3)]
+    assert [result.link for result in results] == [f"https://doi.org/10.3390/su14{n}" for n in range(3)]
+    assert [result.doi for result in results] == [f"10.3390/su14{n}" for n in range(3)]
+
+def test_link_falls_back_to_article_link_without_doi():
+    result = _doaj_result(_item(1, [{"type": "eissn", "id": "8765-4321"}]), "q", "Here")
+    assert result.link == "https://journal.example.org/1"
+    assert result.doi == ""
@@ -0,0 +1,30 @@
+import pandas as pd
+from normalize import normalize_results
+
+COLUMNS = ["Search Platform", "Title", "Link", "DOI", "Year", "Authors", "Venue", "Description"]
+
+def _normalize(rows, decorated=True):
+    df = pd.DataFrame([row + ("",) * (len(COLUMNS) - len(row)) for row in rows], columns=COLUMNS)
+    df["Year"] = pd.Series([pd.NA] * len(df), dtype="Int32")
+    return normalize_results(df, decorated=pd.Series(decorated, index=df.index))
+
+def test_zenodo_creators_suffix_moves_into_authors():
+    df = _normalize([("Zenodo", "Deep Learning for Cities - Smith, John, Doe, Jane", "https://zenodo.org/records/1"),
+                     ("Zenodo", "Soil survey - Unknown Author", "https://zenodo.org/records/2")])
+    assert list(df["Title"]) == ["Deep Learning for Cities", "Soil survey"]
+    assert list(df["Authors"]) == ["Smith, John; Doe, Jane", ""]
+    assert list(df["Venue"]) == ["", ""]
+
+def test_hyphenated_titles_are_only_split_on_a_venue():
+    df = _normalize([("OpenAIRE", "COVID-19 - a review", "https://explore.openaire.eu/1"),
+                     ("OpenAIRE", "Soil carbon - Journal of Soil Science", "https://explore.openaire.eu/2"),
+                     ("CORE", "Soil - water balance - Unknown Publisher", "https://core.ac.uk/works/3")])
+    assert list(df["Title"]) == ["COVID-19 - a review", "Soil carbon", "Soil - water balance"]
+    assert list(df["Venue"]) == ["", "Journal of Soil Science", ""]
+
+def test_last_first_author_names_stay_whole():
+    df = _normalize([("CORE", "Soil carbon - Geoderma", "https://core.ac.uk/works/1", "", "", "", "",
+                      "Authors: Smith, John\n\nAbstract: soil"),
+                     ("CORE", "Soil water - Geoderma", "https://core.ac.uk/works/2", "", "", "", "",
+                      "Authors: John Smith, Jane Doe\n\nAbstract: water")])
+    assert list(df["Authors"]) == ["Smith, John", "John Smith; Jane Doe"]
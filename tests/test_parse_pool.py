@@ -0,0 +1,40 @@
+import json
+import parse_pool
+import response_cache
+from providers.common import iter_pages
+from results import SearchResult
+
+TOTAL = 250
+
+def parse_page(response):
+    data = response.json()
+    return data["items"], data["total"]
+
+def make_result(item, query, location):
+    return SearchResult("Fake", "2026-01-01", location, query, f"https://example.org/{item}", f"Result {item}")
+
+def test_pooled_pages_are_fetched_ahead_and_yielded_in_order(monkeypatch):
+    requested = []
+
+    def cached_request(provider, query, offset, page_size, method, url, **kwargs):
+        requested.append(offset)
+        items = list(range(offset, min(offset + page_size, TOTAL)))
+        return response_cache.CachedResponse(200, json.dumps({"items": items, "total": TOTAL}).encode(), "utf-8")
+
+    monkeypatch.setenv("MSA_LOCATION", "Here")
+    monkeypatch.setattr(response_cache, "cached_request", cached_request)
+    monkeypatch.setattr(parse_pool, "_workers", 2)
+    try:
+        pages = iter_pages("Fake", "q", 1000, 25, lambda offset, size: ("GET", "https://example.org", {}),
+                           parse_page, make_result)
+        first = next(pages)
+        # Nothing is fetched ahead until the first page has given the total
+        assert requested == [0]
+        second = next(pages)
+        assert requested[:4] == [0, 25, 50, 75]
+        links = [result.link for batch in [first, second, *pages] for result in batch]
+    finally:
+        parse_pool.shutdown()
+
+    assert links == [f"https://example.org/{n}" for n in range(TOTAL)]
+    assert requested == list(range(0, TOTAL, 25))
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+import http_client
+import response_cache
+
+URL = "https://example.org/api"
+
+class FakeResponse:
+    status_code = 200
+    content = b"{}"
+    encoding = "utf-8"
+
+def test_normalize_query_keeps_case():
+    assert response_cache.normalize_query("  soil   AND water ") == "soil AND water"
+    assert response_cache.normalize_query("soil AND water") != response_cache.normalize_query("soil and water")
+
+def test_flight_lands_when_storing_fails(monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(response_cache, "_enabled", False)
+    monkeypatch.setattr(http_client, "request", lambda *args, **kwargs: FakeResponse())
+    monkeypatch.setattr(response_cache, "_received", fail)
+
+    with pytest.raises(OSError):
+        response_cache.cached_request("fake", "q", 1, 10, "GET", URL)
+    assert response_cache._flights == {}
+
+def test_cancelled_leader_releases_its_waiters(monkeypatch):
+    sent = []
+
+    async def fetch(provider, query, page, max_results, method, url, kwargs):
+        sent.append(query)
+        if len(sent) == 1:
+            await asyncio.sleep(60)
+        return response_cache.CachedResponse(200, b"{}", "utf-8")
+
+    monkeypatch.setattr(response_cache, "_enabled", False)
+    monkeypatch.setattr(response_cache, "_fetch_async", fetch)
+
+    async def run():
+        leader = asyncio.create_task(response_cache.cached_request_async("fake", "leader", 1, 10, "GET", URL))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(response_cache.cached_request_async("fake", "waiter", 1, 10, "GET", URL))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()).status_code == 200
+    assert sent == ["leader", "waiter"]
+    assert response_cache._async_flights == {}
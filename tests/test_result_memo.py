@@ -0,0 +1,50 @@
+import threading
+import result_memo
+from results import SearchResult
+
+def _search(calls, hold):
+    # Results 0, 1, ... in batches of 50; hold(offset) runs before each batch
+    def search(query, max_results, start=0):
+        calls.append(start)
+        for offset in range(start, max_results, 50):
+            hold(offset)
+            yield [SearchResult("Fake", "2026-01-01", "Here", query, f"https://example.org/{i}", f"Result {i}")
+                   for i in range(offset, min(offset + 50, max_results))]
+    return search
+
+def _links(batches):
+    return [result.link for batch in batches for result in batch]
+
+def test_overlapping_runs_of_a_query():
+    calls = []
+    short_fetching, long_halfway, short_done = threading.Event(), threading.Event(), threading.Event()
+
+    def hold_short(offset):
+        if offset == 0:
+            short_fetching.set()
+            long_halfway.wait(1)
+
+    def hold_long(offset):
+        if offset == 150:
+            long_halfway.set()
+            short_done.wait(1)
+
+    def run_short():
+        # Finds nothing stored, then stops after its first batch
+        batches = result_memo.iter_results("fake", "soil water", 250, _search(calls, hold_short))
+        next(batches)
+        batches.close()
+        short_done.set()
+
+    short = threading.Thread(target=run_short)
+    short.start()
+    short_fetching.wait(1)
+    long = result_memo.iter_results("fake", "soil  water", 300, _search(calls, hold_long))
+    assert _links(long) == [f"https://example.org/{i}" for i in range(300)]
+    short.join()
+
+    calls.clear()
+    again = result_memo.iter_results("fake", " soil water ", 300, _search(calls, lambda offset: None))
+    assert _links(again) == [f"https://example.org/{i}" for i in range(300)]
+    assert calls == []
+    assert result_memo._turns == {}
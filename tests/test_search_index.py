@@ -0,0 +1,29 @@
+import csv
+import sqlite3
+import search
+import search_index
+from results import SearchResult
+
+def _batch(start, count):
+    return [SearchResult("Zenodo", "2026-01-01", "Here", "soil", f"https://zenodo.org/records/{n}",
+                         f"Soil carbon record {n}") for n in range(start, start + count)]
+
+def test_concurrent_writers_do_not_lock_each_other_out():
+    first, second = search_index.IndexWriter(), search_index.IndexWriter()
+    first.add_records(_batch(0, 10))
+    second.add_records(_batch(10, 10))
+    first.add_records(_batch(20, 10))
+    first.close()
+    second.close()
+    rows, _ = search_index.find("soil", limit=100)
+    assert len(rows) == 30
+
+def test_index_failure_does_not_lose_results(tmp_path, monkeypatch):
+    def locked(self, records):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(search_index.IndexWriter, "add_records", locked)
+    filename = search.save_stream(iter([("zenodo", _batch(0, 10)), ("zenodo", _batch(10, 10))]), "soil", "csv")
+    with open(filename, newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 20
@@ -0,0 +1,214 @@
+import os
+import csv
+import threading
+from results import RESULT_COLUMNS, INTEGER_COLUMNS, arrow_schema, to_arrow
+
+OUTPUT_FORMATS = ["parquet", "feather", "csv", "ods"]
+
+# File extensions the clean step can read back, fastest first
+READABLE_EXTENSIONS = (".parquet", ".feather", ".csv", ".ods")
+
+class ResultWriter:
+    extension = None
+
+    def __init__(self, base_path, columns=RESULT_COLUMNS):
+        self.output_path = f"{base_path}.{self.extension}"
+        self.columns = list(columns)
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def write_batch(self, batch):
+        if not batch:
+            return
+        with self._lock:
+            self._write(batch)
+            self.rows += len(batch)
+
+    def write_records(self, records):
+        # SearchResult records, see results.py
+        self.write_batch([record.as_row() for record in records])
+
+    def write_frame(self, df):
+        df = df[self.columns].astype(object)
+        self.write_batch(list(df.where(df.notna(), None).itertuples(index=False, name=None)))
+
+    def close(self):
+        # Returns the written file, or None when nothing was written
+        with self._lock:
+            return self._close() if self.rows else None
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+class CsvResultWriter(ResultWriter):
+    extension = "csv"
+
+    def __init__(self, base_path, columns=RESULT_COLUMNS):
+        super().__init__(base_path, columns)
+        self._path = self.output_path
+        self._file = None
+
+    def _write(self, batch):
+        if self._file is None:
+            self._file = open(self._path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+        self._writer.writerows(batch)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+        return self.output_path
+
+class OdsResultWriter(CsvResultWriter):
+    # odfpy cannot append, so rows go to a CSV journal that close() turns
+    # into the ODS file; an interrupted conversion still leaves the journal
+    extension = "ods"
+
+    def __init__(self, base_path, columns=RESULT_COLUMNS):
+        super().__init__(base_path, columns)
+        self._path = f"{base_path}.partial.csv"
+
+    def _close(self):
+        import pandas as pd
+        self._file.close()
+        df = pd.read_csv(self._path, dtype=str, keep_default_na=False)
+        df.to_excel(self.output_path, engine="odf", index=False)
+        os.remove(self._path)
+        return self.output_path
+
+class _ArrowResultWriter(ResultWriter):
+    # Batches are buffered as Arrow tables and written ARROW_BATCH_ROWS at
+    # a time, so the files don't end up with thousands of tiny row groups
+    ARROW_BATCH_ROWS = 1000
+
+    def __init__(self, base_path, columns=RESULT_COLUMNS):
+        super().__init__(base_path, columns)
+        import pyarrow as pa
+        self._pa = pa
+        self._schema = arrow_schema(self.columns)
+        self._buffer = []
+        self._buffered = 0
+        self._sink = None
+
+    def _write(self, batch):
+        arrays = [self._array(values, field.type) for values, field in zip(zip(*batch), self._schema)]
+        self._append(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def _array(self, values, type):
+        if type == self._pa.string():
+            values = [None if value is None else str(value) for value in values]
+        return self._pa.array(values, type)
+
+    def _append(self, table):
+        self._buffer.append(table)
+        self._buffered += table.num_rows
+        if self._buffered >= self.ARROW_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._sink is None:
+            self._sink = self._open_sink()
+        self._sink.write_table(self._pa.concat_tables(self._buffer))
+        self._buffer = []
+        self._buffered = 0
+
+    def write_records(self, records):
+        # Records go to Arrow column by column, without building row tuples
+        if not records:
+            return
+        table = to_arrow(records, self._schema)
+        with self._lock:
+            self._append(table)
+            self.rows += table.num_rows
+
+    def write_frame(self, df):
+        import pandas as pd
+        df = df[self.columns]
+        df = df.assign(**{column: pd.to_numeric(df[column], errors="coerce").astype("Int32")
+                          if column in INTEGER_COLUMNS else df[column].astype("string")
+                          for column in self.columns})
+        table = self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        with self._lock:
+            self._append(table)
+            self._flush()
+            self.rows += table.num_rows
+
+    def _close(self):
+        self._flush()
+        self._sink.close()
+        return self.output_path
+
+class ParquetResultWriter(_ArrowResultWriter):
+    extension = "parquet"
+
+    def _open_sink(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.output_path, self._schema, compression="zstd")
+
+class FeatherResultWriter(_ArrowResultWriter):
+    extension = "feather"
+
+    def _open_sink(self):
+        return self._pa.ipc.new_file(self.output_path, self._schema)
+
+WRITERS = {
+    "parquet": ParquetResultWriter,
+    "feather": FeatherResultWriter,
+    "csv": CsvResultWriter,
+    "ods": OdsResultWriter
+}
+
+def open_writer(base_path, output_format=None, columns=RESULT_COLUMNS):
+    output_format = output_format or os.getenv("MSA_OUTPUT_FORMAT", "parquet")
+    return WRITERS[output_format](base_path, columns)
+
+def write_frame(df, base_path, output_format=None):
+    writer = open_writer(base_path, output_format, df.columns)
+    writer.write_frame(df)
+    return writer.close()
+
+def read_results_columns(path):
+    # Column names of a result file, or None when they need a full read
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    if path.endswith(".feather"):
+        import pyarrow as pa
+        return pa.ipc.open_file(path).schema.names
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+    return None
+
+def read_results(path, columns=None, fill_missing=True):
+    # Columns missing from older result files come back empty, or are left
+    # out with fill_missing=False
+    import pandas as pd
+    missing = []
+    if columns:
+        available = read_results_columns(path)
+        if available is not None:
+            missing = [column for column in columns if column not in available]
+            columns = [column for column in columns if column in available]
+
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=columns)
+    elif path.endswith(".feather"):
+        df = pd.read_feather(path, columns=columns)
+    elif path.endswith(".csv"):
+        df = pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(path, engine="odf")
+        missing = [column for column in columns or [] if column not in df]
+        df = df[[column for column in columns if column in df]] if columns else df
+
+    if fill_missing:
+        for column in missing:
+            df[column] = ""
+    return df